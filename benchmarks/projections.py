@@ -0,0 +1,76 @@
+"""Parse time and retained memory of full response models versus their core projections.
+
+Validates every recorded page of the routes with a `core` projection from a cassette,
+once into the full model and once into the projection:
+
+    poetry run soundcloud_tools --dry-run --exclude-liked --record weekly.jsonl
+    poetry run python -m benchmarks.projections weekly.jsonl
+
+The settings are read from `.env` like the CLI, nothing is sent to the API.
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from soundcloud_tools.cassette import Cassette
+from soundcloud_tools.client import Client, RouteSpec
+
+
+def get_routes() -> list[RouteSpec]:
+    routes = (getattr(getattr(Client, name), "spec", None) for name in dir(Client))
+    return [spec for spec in routes if spec and spec.projection_adapters]
+
+
+def get_pages(cassette: Cassette, spec: RouteSpec) -> list[bytes]:
+    pattern = re.compile("^" + re.sub(r"\{\w+\}", "[^/]+", spec.path) + "$")
+    return [
+        interaction.body.encode()
+        for interactions in cassette.interactions.values()
+        for interaction in interactions
+        if interaction.status_code == 200 and pattern.search(interaction.path.strip("/"))
+    ]
+
+
+def measure(adapter: TypeAdapter, pages: list[bytes], repeat: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            adapter.validate_json(page)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    retained = [adapter.validate_json(page) for page in pages]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    cassette = Cassette(args.cassette)
+
+    for spec in get_routes():
+        if not (pages := get_pages(cassette, spec)):
+            continue
+        size = sum(map(len, pages)) / 1024**2
+        print(f"{spec.name}: {len(pages)} pages, {size:.1f} MiB")  # noqa: T201
+        full_time, full_memory = measure(spec.response_adapter, pages, args.repeat)
+        for name, adapter in spec.projection_adapters.items():
+            time_, memory = measure(adapter, pages, args.repeat)
+            print(  # noqa: T201
+                f"  {name:>6}: {time_ * 1e3:8.1f} ms ({full_time / time_:4.1f}x faster), "
+                f"{memory / 1024**2:6.1f} MiB retained ({full_memory / memory:4.1f}x less)"
+            )
+        print(f"    full: {full_time * 1e3:8.1f} ms, {full_memory / 1024**2:6.1f} MiB retained")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Per-call overhead of the `route` decorator, excluding the network.
+
+Compares building the request parameters by introspecting the endpoint on every
+call (`SplitParams.from_route` plus a new `TypeAdapter`) with the precompiled
+`RouteSpec` that `route` builds at decoration time.
+
+    poetry run python -m benchmarks.route_overhead
+
+The settings are read from `.env` like the CLI, nothing is sent to the API.
+"""
+
+import asyncio
+import time
+
+from pydantic import TypeAdapter
+
+from soundcloud_tools import models as scm
+from soundcloud_tools.client import Client, SplitParams
+
+N = 10_000
+
+
+async def introspected(client: Client):
+    endpoint = Client.get_user_likes.__wrapped__
+    await SplitParams.from_route(client, endpoint, "users/{user_id}/likes", user_id=1, limit=200, offset="abc")
+    TypeAdapter(scm.Likes)
+
+
+async def precompiled(client: Client):
+    spec = Client.get_user_likes.spec
+    await SplitParams.from_spec(client, spec, user_id=1, limit=200, offset="abc")
+    assert spec.response_adapter is not None
+
+
+async def measure(func, client: Client) -> float:
+    start = time.perf_counter()
+    for _ in range(N):
+        await func(client)
+    return (time.perf_counter() - start) / N
+
+
+async def main():
+    client = Client()
+    before = await measure(introspected, client)
+    after = await measure(precompiled, client)
+    print(f"introspected: {before * 1e6:8.1f} µs/call")  # noqa: T201
+    print(f"precompiled:  {after * 1e6:8.1f} µs/call ({before / after:.1f}x faster)")  # noqa: T201
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
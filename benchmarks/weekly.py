@@ -0,0 +1,74 @@
+"""Offline benchmark of the weekly playlist workflow against a recorded cassette.
+
+Record a cassette once with live credentials, then replay it with simulated latency
+and rate limiting to compare client changes reproducibly:
+
+    poetry run soundcloud_tools --dry-run --exclude-liked --record weekly.jsonl
+    poetry run python -m benchmarks.weekly weekly.jsonl --latency 0.1 --error-rate 0.02
+
+The settings are read from `.env` like the CLI, so `USER_ID` (or `--user-id`) must be
+the user the cassette was recorded for. The clock is pinned to the recording time,
+so the replayed weeks match the recorded requests.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+import httpx
+
+from soundcloud_tools.cassette import Cassette, FaultInjector, ReplayTransport
+from soundcloud_tools.client import Client
+from soundcloud_tools.settings import get_settings
+from soundcloud_tools.utils import frozen_time, utcnow
+from soundcloud_tools.weekly import create_weekly_favorite_playlist
+
+
+class CountingTransport(ReplayTransport):
+    requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return await super().handle_async_request(request)
+
+
+async def run(args: argparse.Namespace) -> tuple[float, int, int]:
+    faults = FaultInjector(latency=args.latency, error_rate=args.error_rate, retry_after=args.retry_after)
+    cassette = Cassette(args.cassette)
+    transport = CountingTransport(cassette, faults=faults)
+    start = time.perf_counter()
+    with frozen_time(cassette.recorded_at or utcnow()):
+        async with Client(transport=transport) as client:
+            track_ids = await create_weekly_favorite_playlist(
+                client=client,
+                user_id=args.user_id or get_settings().user_id,
+                types=["track-repost", "track"],
+                week=args.week,
+                exclude_liked=args.exclude_liked,
+                dry_run=True,
+            )
+    return time.perf_counter() - start, transport.requests, len(track_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--user-id", type=int, help="User the cassette was recorded for, defaults to USER_ID")
+    parser.add_argument("--week", type=int, default=0)
+    parser.add_argument("--exclude-liked", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    for i in range(args.repeat):
+        elapsed, requests, tracks = asyncio.run(run(args))
+        print(f"run {i + 1}: {elapsed:6.2f}s, {requests} requests, {tracks} tracks")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
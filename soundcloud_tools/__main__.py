@@ -1,52 +1,263 @@
 import argparse
 import asyncio
 import logging
-from typing import Literal
+from pathlib import Path
+from typing import Literal, get_args
 
+from soundcloud_tools.cache import get_response_cache
+from soundcloud_tools.cassette import Cassette, ReplayTransport
+from soundcloud_tools.checkpoint import Checkpoints
 from soundcloud_tools.client import Client
+from soundcloud_tools.index import LikedTrackIndex, SeenTrackIndex
+from soundcloud_tools.models.stream import StreamItemType
+from soundcloud_tools.ranking import PRESETS
 from soundcloud_tools.settings import get_settings
-from soundcloud_tools.weekly import create_weekly_favorite_playlist
+from soundcloud_tools.snapshot import WeeklySnapshot
+from soundcloud_tools.store import get_entity_store
+from soundcloud_tools.sync import StreamSync
+from soundcloud_tools.weekly import (
+    Items,
+    collect_weekly_snapshot,
+    create_weekly_favorite_playlist,
+    create_weekly_favorite_playlists,
+    get_run_name,
+    get_week_timespan,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def get_weekly_snapshot(
+    client: Client,
+    mode: Literal["create", "load"] | None,
+    resume: bool,
+    user_id: int,
+    week: int,
+    **kwargs,
+) -> WeeklySnapshot | None:
+    """Collects and stores the week's snapshot, or loads it when loading or resuming.
+
+    Without a stored snapshot to load, the playlist is collected live instead of failing.
+    """
+    if mode is None:
+        return None
+    start, end = get_week_timespan(week)
+    if (mode == "load" or resume) and (weekly_snapshot := WeeklySnapshot.load(user_id, start=start, end=end)):
+        return weekly_snapshot
+    if mode == "load":
+        logger.warning(f"No snapshot for the week of {start.date()}, collecting the playlist instead")
+        return None
+    weekly_snapshot = await collect_weekly_snapshot(client, user_id=user_id, week=week, **kwargs)
+    weekly_snapshot.save()
+    return weekly_snapshot
+
+
+async def run_weekly(
+    cache: bool = False,
+    store: bool = False,
+    record: Path | None = None,
+    replay: Path | None = None,
+    metrics: Path | None = None,
+    incremental: bool = False,
+    backfill_seen: bool = False,
+    snapshot: Literal["create", "load"] | None = None,
+    weeks: range | None = None,
+    resume: bool = False,
+    **kwargs,
+):
+    client = Client(
+        cache=get_response_cache() if cache else None,
+        store=get_entity_store() if store else None,
+        recorder=Cassette(record) if record else None,
+        transport=ReplayTransport(Cassette(replay)) if replay else None,
+    )
+    try:
+        async with client:
+            stream_sync = StreamSync(user_id=kwargs["user_id"]) if incremental else None
+            liked_index = LikedTrackIndex(user_id=kwargs["user_id"]) if incremental else None
+            seen_index = SeenTrackIndex(user_id=kwargs["user_id"]) if incremental or backfill_seen else None
+            if seen_index and backfill_seen:
+                await seen_index.backfill(client)
+            if weeks:
+                kwargs.pop("week")
+                return await create_weekly_favorite_playlists(
+                    client,
+                    weeks=weeks,
+                    stream_sync=stream_sync,
+                    liked_index=liked_index,
+                    seen_index=seen_index,
+                    resume=resume,
+                    **kwargs,
+                )
+            weekly_snapshot = await get_weekly_snapshot(
+                client,
+                mode=snapshot,
+                resume=resume,
+                user_id=kwargs["user_id"],
+                types=kwargs["types"],
+                week=kwargs["week"],
+                exclude_liked=kwargs["exclude_liked"],
+                stream_sync=stream_sync,
+                liked_index=liked_index,
+                seen_index=seen_index,
+            )
+            run_name = get_run_name(
+                kwargs["user_id"],
+                kwargs["types"],
+                week=kwargs["week"],
+                half=kwargs["half"],
+                release_type=kwargs["release_type"],
+            )
+            checkpoints = Checkpoints(run_name, resume=resume)
+            track_ids = await create_weekly_favorite_playlist(
+                client=client,
+                checkpoints=checkpoints,
+                stream_sync=stream_sync,
+                liked_index=liked_index,
+                seen_index=seen_index,
+                snapshot=weekly_snapshot,
+                **kwargs,
+            )
+            checkpoints.clear()
+            return track_ids
+    finally:
+        report = client.metrics.to_json(indent=2)
+        logger.info(f"Run metrics:\n{report}")
+        if metrics:
+            metrics.write_text(report)
 
 
 def main(
     week: int = 0,
+    types: list[Items] | None = None,
     exclude_liked: bool = False,
     half: Literal["first", "second"] | None = None,
     release_type: Literal["new", "old"] | None = None,
+    ranking: str | None = None,
     dry_run: bool = False,
+    cache: bool = False,
+    store: bool = False,
+    record: Path | None = None,
+    replay: Path | None = None,
+    metrics: Path | None = None,
+    incremental: bool = False,
+    backfill_seen: bool = False,
+    snapshot: Literal["create", "load"] | None = None,
+    weeks: range | None = None,
+    resume: bool = False,
 ):
     logging.basicConfig(level=logging.INFO)
+    types = types or ["track-repost", "track"]
     asyncio.run(
-        create_weekly_favorite_playlist(
-            client=Client(),
+        run_weekly(
             user_id=get_settings().user_id,
-            types=["track-repost", "track"],
+            types=types,
             week=week,
             exclude_liked=exclude_liked,
             half=half,
             release_type=release_type,
+            ranking=ranking,
             dry_run=dry_run,
+            cache=cache,
+            store=store,
+            record=record,
+            replay=replay,
+            metrics=metrics,
+            incremental=incremental,
+            backfill_seen=backfill_seen,
+            snapshot=snapshot,
+            weeks=weeks,
+            resume=resume,
         )
     )
 
 
+def parse_weeks(value: str) -> range:
+    """Parses a range of weeks ago like `8..0` into the `week` offsets `-8` to `0`."""
+    first, sep, last = value.partition("..")
+    try:
+        ago = sorted({int(first), int(last) if sep else int(first)})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid week range {value!r}, expected weeks ago like 8..0") from None
+    if ago[0] < 0:
+        raise argparse.ArgumentTypeError(f"Invalid week range {value!r}, weeks are counted back from 0 like 8..0")
+    return range(-ago[-1], -ago[0] + 1)
+
+
 def main_script():
     parser = argparse.ArgumentParser()
     parser.add_argument("--week", type=int, default=0)
+    parser.add_argument(
+        "--weeks",
+        type=parse_weeks,
+        default=None,
+        help="Range of weeks ago like 8..0, creates the playlists of all weeks from a single collection pass",
+    )
+    parser.add_argument(
+        "--types",
+        nargs="+",
+        default=["track-repost", "track"],
+        choices=[*get_args(StreamItemType), "comment", "story"],
+        help="Sources of the playlist tracks",
+    )
     parser.add_argument("--first", action="store_true")
     parser.add_argument("--second", action="store_true")
     parser.add_argument("--exclude-liked", action="store_true")
     parser.add_argument("--release-type", type=str, default=None, choices=["new", "old"])
+    parser.add_argument(
+        "--ranking",
+        default=None,
+        choices=list(PRESETS),
+        help="Ranking preset for the track order, defaults to followers for new and playcount for old releases",
+    )
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="Cache responses on disk between runs")
+    parser.add_argument(
+        "--store", action="store_true", help="Keep the fetched tracks, users and collection edges in a local database"
+    )
+    parser.add_argument("--record", type=Path, default=None, help="Record all responses to a JSONL cassette")
+    parser.add_argument("--replay", type=Path, default=None, help="Replay responses from a JSONL cassette")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep local copies of the stream, likes and seen tracks and only fetch new items",
+    )
+    parser.add_argument(
+        "--backfill-seen", action="store_true", help="Add all weekly playlists of the user to the seen tracks index"
+    )
+    parser.add_argument(
+        "--snapshot", action="store_true", help="Store the collected candidates of the week for --from-snapshot"
+    )
+    parser.add_argument(
+        "--from-snapshot", action="store_true", help="Create the playlist from the week's snapshot without collecting"
+    )
+    parser.add_argument("--resume", action="store_true", help="Continue a failed run after its last completed stage")
+    parser.add_argument("--metrics", type=Path, default=None, help="Write request and phase metrics as JSON")
     args = parser.parse_args()
     if args.first and args.second:
         raise ValueError("Cannot specify both first and second half")
+    if args.snapshot and args.from_snapshot:
+        raise ValueError("Cannot specify both snapshot and from-snapshot")
+    if args.weeks and (args.snapshot or args.from_snapshot):
+        raise ValueError("Cannot specify weeks with snapshot or from-snapshot")
     main(
         week=args.week,
+        types=args.types,
         exclude_liked=args.exclude_liked,
         half="first" if args.first else "second" if args.second else None,
         release_type=args.release_type,
+        ranking=args.ranking,
         dry_run=args.dry_run,
+        cache=args.cache,
+        store=args.store,
+        record=args.record,
+        replay=args.replay,
+        metrics=args.metrics,
+        incremental=args.incremental,
+        backfill_seen=args.backfill_seen,
+        weeks=args.weeks,
+        resume=args.resume,
+        snapshot="create" if args.snapshot else "load" if args.from_snapshot else None,
     )
 
 
@@ -0,0 +1,247 @@
+"""Compact on-disk archives of fetched collections (likes, reposts, stream items).
+
+An archive stores the columns of a `TrackTable` and the items themselves:
+
+    MAGIC | version (u16) | header size (u32) | JSON header | aligned blocks
+
+Numeric and datetime columns are raw little-endian arrays that are memory-mapped on
+load, string columns and the item JSON are zlib compressed. Items are compressed in
+chunks and only decompressed and validated when they are accessed, so opening an
+archive of tens of thousands of likes only maps the file and inflates the strings.
+"""
+
+import json
+import logging
+import mmap
+import struct
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+from pydantic import BaseModel, TypeAdapter
+
+from soundcloud_tools.models.core import LikeCore, RepostCore, StreamItemCore, TrackCore
+from soundcloud_tools.models.like import TrackLike
+from soundcloud_tools.models.repost import TrackRepost
+from soundcloud_tools.models.stream import StreamItem, TrackStreamItem, TrackStreamRepostItem
+from soundcloud_tools.models.table import TrackTable
+from soundcloud_tools.models.track import Track
+from soundcloud_tools.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SCTA"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<4sHI")
+ALIGNMENT = 64
+CHUNK_SIZE = 1024
+"""Items per compressed chunk"""
+COMPRESSION_LEVEL = 3
+"""Half the time of the default level for a slightly larger file"""
+
+ItemKind = Literal["track", "like", "repost", "stream", "track-core", "like-core", "repost-core", "stream-core"]
+ITEM_MODELS: dict[ItemKind, Any] = {
+    "track": Track,
+    "like": TrackLike,
+    "repost": TrackRepost,
+    "stream": StreamItem,
+    "track-core": TrackCore,
+    "like-core": LikeCore,
+    "repost-core": RepostCore,
+    "stream-core": StreamItemCore,
+}
+ITEM_KINDS: dict[type, ItemKind] = {
+    Track: "track",
+    TrackLike: "like",
+    TrackRepost: "repost",
+    TrackStreamItem: "stream",
+    TrackStreamRepostItem: "stream",
+    TrackCore: "track-core",
+    LikeCore: "like-core",
+    RepostCore: "repost-core",
+    StreamItemCore: "stream-core",
+}
+
+
+class Block(BaseModel):
+    offset: int
+    nbytes: int
+    dtype: str | None = None
+    """NumPy dtype of raw columns, `None` for compressed blocks"""
+
+
+class ArchiveHeader(BaseModel):
+    version: int = FORMAT_VERSION
+    kind: ItemKind
+    count: int
+    created_at: datetime
+    columns: dict[str, Block]
+    item_offsets: Block
+    """Offsets of the items in their concatenated JSON, one more than items"""
+    chunks: list[Block]
+
+
+class CollectionDiff(BaseModel):
+    added: list[int]
+    removed: list[int]
+
+
+def get_archive_path(name: str, user_id: int) -> Path:
+    return get_settings().data_path / "collections" / f"{name}-{user_id}.scta"
+
+
+def get_item_kind(items: Iterable[Any]) -> ItemKind:
+    kinds = {ITEM_KINDS[type(item)] for item in items if type(item) in ITEM_KINDS}
+    if len(kinds) > 1:
+        raise ValueError(f"Cannot archive mixed items {sorted(kinds)}")
+    return kinds.pop() if kinds else "track"
+
+
+def encode_strings(values: np.ndarray) -> bytes:
+    return zlib.compress(json.dumps(values.tolist()).encode(), COMPRESSION_LEVEL)
+
+
+def decode_strings(data: bytes, count: int) -> np.ndarray:
+    values = np.empty(count, dtype=object)
+    values[:] = json.loads(zlib.decompress(data))
+    return values
+
+
+class ArchiveWriter:
+    def __init__(self):
+        self.blocks: list[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes, dtype: str | None = None) -> Block:
+        padding = -self.size % ALIGNMENT
+        self.blocks.append(b"\0" * padding + data)
+        self.size += padding
+        block = Block(offset=self.size, nbytes=len(data), dtype=dtype)
+        self.size += len(data)
+        return block
+
+
+def write_archive(path: Path, items: Iterable[Any]) -> ArchiveHeader:
+    """Writes the items that hold a track to an archive at `path`, replacing it atomically."""
+    table = TrackTable.from_items(items)
+    writer = ArchiveWriter()
+    columns = {
+        name: writer.add(encode_strings(values))
+        if values.dtype == object
+        else writer.add(np.ascontiguousarray(values).astype(values.dtype.newbyteorder("<")).tobytes(), values.dtype.str)
+        for name, values in table.columns.items()
+    }
+    payloads = [item.model_dump_json(exclude_defaults=True).encode() for item in table.items]
+    offsets = np.zeros(len(payloads) + 1, dtype="<i8")
+    np.cumsum([len(p) for p in payloads], out=offsets[1:])
+    item_offsets = writer.add(offsets.tobytes(), offsets.dtype.str)
+    chunks = [
+        writer.add(zlib.compress(b"".join(payloads[start : start + CHUNK_SIZE]), COMPRESSION_LEVEL))
+        for start in range(0, len(payloads), CHUNK_SIZE)
+    ]
+    header = ArchiveHeader(
+        kind=get_item_kind(table.items),
+        count=len(table),
+        created_at=datetime.now(tz=timezone.utc),
+        columns=columns,
+        item_offsets=item_offsets,
+        chunks=chunks,
+    )
+    header_bytes = header.model_dump_json().encode()
+    start = PREAMBLE.size + len(header_bytes)
+    start += -start % ALIGNMENT
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes.ljust(start - PREAMBLE.size, b" "))
+        # Block offsets are relative to the aligned end of the header
+        f.writelines(writer.blocks)
+    tmp_path.replace(path)
+    logger.info(f"Archived {header.count} {header.kind} items to {path} ({start + writer.size} bytes)")
+    return header
+
+
+class LazyItems:
+    """Items of an archive by row, validated on first access."""
+
+    def __init__(self, archive: "CollectionArchive", rows: np.ndarray):
+        self.archive = archive
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, int | np.integer):
+            return self.archive.get_item(int(self.rows[key]))
+        return LazyItems(self.archive, self.rows[key])
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self.archive.get_item(int(row)) for row in self.rows)
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        return np.fromiter(self, dtype=object, count=len(self))
+
+
+class CollectionArchive:
+    """Memory-mapped archive, use `table` for the columns and lazily validated items."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size = PREAMBLE.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a collection archive")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported collection archive version {version} in {path}")
+        self.header = ArchiveHeader.model_validate_json(self.buffer[PREAMBLE.size : PREAMBLE.size + header_size])
+        self.start = PREAMBLE.size + header_size
+        self.start += -self.start % ALIGNMENT
+        self.adapter = TypeAdapter(ITEM_MODELS[self.header.kind])
+        self.item_offsets = self.get_column(self.header.item_offsets, self.header.count + 1)
+        self.chunks: dict[int, bytes] = {}
+        self.validated: dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return self.header.count
+
+    def get_bytes(self, block: Block) -> bytes:
+        return self.buffer[self.start + block.offset : self.start + block.offset + block.nbytes]
+
+    def get_column(self, block: Block, count: int) -> np.ndarray:
+        if block.dtype is None:
+            return decode_strings(self.get_bytes(block), count)
+        return np.frombuffer(self.buffer, dtype=block.dtype, count=count, offset=self.start + block.offset)
+
+    def get_item(self, row: int) -> Any:
+        if row not in self.validated:
+            chunk_index = row // CHUNK_SIZE
+            if chunk_index not in self.chunks:
+                self.chunks[chunk_index] = zlib.decompress(self.get_bytes(self.header.chunks[chunk_index]))
+            base = self.item_offsets[chunk_index * CHUNK_SIZE]
+            start, end = self.item_offsets[row] - base, self.item_offsets[row + 1] - base
+            self.validated[row] = self.adapter.validate_json(self.chunks[chunk_index][start:end])
+        return self.validated[row]
+
+    @property
+    def table(self) -> TrackTable:
+        columns = {name: self.get_column(block, len(self)) for name, block in self.header.columns.items()}
+        return TrackTable(LazyItems(self, np.arange(len(self))), columns)  # type: ignore[arg-type]
+
+
+def load_archive(path: Path) -> CollectionArchive | None:
+    return CollectionArchive(path) if path.exists() else None
+
+
+def diff_tables(old: TrackTable, new: TrackTable, column: str = "id") -> CollectionDiff:
+    """Values of `column` that were added to or removed from a collection between two tables."""
+    return CollectionDiff(
+        added=np.setdiff1d(new[column], old[column]).tolist(),
+        removed=np.setdiff1d(old[column], new[column]).tolist(),
+    )
@@ -0,0 +1,238 @@
+import abc
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse as urlparse
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel
+
+from soundcloud_tools.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+# Time to live per endpoint path (relative to the API base url), first match wins.
+# Endpoints without a match are not cached.
+DEFAULT_TTLS: dict[str, int] = {
+    r"^tracks(/\d+)?$": 24 * HOUR,
+    r"^users/\d+$": 24 * HOUR,
+    r"^users/\d+/": 30 * MINUTE,
+    r"^playlists/": 30 * MINUTE,
+    r"^search": 1 * HOUR,
+    r"^stream$": 30 * MINUTE,
+}
+# Cached paths that a successful write (POST, PUT, DELETE) to a matching path makes stale
+DEFAULT_INVALIDATIONS: dict[str, list[str]] = {
+    r"^playlists": [r"^playlists/", r"^users/\d+/playlists"],
+    r"^users/\d+/": [r"^users/\d+"],
+}
+# Headers that describe the transfer rather than the (already decoded) body
+EXCLUDED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+# Request headers for lookups that must be current, a fresh cached response is revalidated first
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+class CachedResponse(BaseModel):
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers to revalidate a stale entry."""
+        validators = {}
+        if etag := self.headers.get("etag"):
+            validators["If-None-Match"] = etag
+        if last_modified := self.headers.get("last-modified"):
+            validators["If-Modified-Since"] = last_modified
+        return validators
+
+    def to_response(self, method: str) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=httpx.Request(method, self.url),
+        )
+
+
+class ResponseCache(abc.ABC):
+    """Base class for response caches used by `Client.make_request`."""
+
+    def __init__(self, ttls: dict[str, int] | None = None, invalidations: dict[str, list[str]] | None = None):
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or DEFAULT_TTLS).items()]
+        self.invalidations = [
+            (re.compile(pattern), [re.compile(stale) for stale in stales])
+            for pattern, stales in (invalidations or DEFAULT_INVALIDATIONS).items()
+        ]
+
+    @staticmethod
+    def get_path(url: str) -> str:
+        return httpx.URL(url).path.strip("/")
+
+    @staticmethod
+    def make_key(method: str, url: str, params: dict) -> str:
+        query = urlparse.urlencode(sorted((k, str(v)) for k, v in params.items()))
+        return hashlib.sha256(f"{method.upper()} {url}?{query}".encode()).hexdigest()
+
+    @staticmethod
+    def must_revalidate(headers: dict[str, str]) -> bool:
+        return "no-cache" in httpx.Headers(headers).get("cache-control", "").lower()
+
+    def get_ttl(self, url: str) -> int:
+        path = self.get_path(url)
+        return next((ttl for pattern, ttl in self.ttls if pattern.search(path)), 0)
+
+    def invalidate(self, url: str):
+        """Drops the cached responses that a write to `url` made stale."""
+        path = self.get_path(url)
+        stales = [stale for pattern, stales in self.invalidations if pattern.search(path) for stale in stales]
+        if stales:
+            self.delete_matching(stales)
+
+    @abc.abstractmethod
+    def get(self, key: str) -> CachedResponse | None: ...
+
+    @abc.abstractmethod
+    def set(self, key: str, response: httpx.Response, ttl: int): ...
+
+    @abc.abstractmethod
+    def refresh(self, key: str, ttl: int): ...
+
+    @abc.abstractmethod
+    def delete_matching(self, patterns: list[re.Pattern]):
+        """Deletes the entries whose url path matches any of `patterns`."""
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Persistent response cache with least recently used eviction by total size.
+
+    The connection is shared by worker threads and Streamlit reruns, a lock serializes its use.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_size: int = 256 * 1024**2,
+        ttls: dict[str, int] | None = None,
+        invalidations: dict[str, list[str]] | None = None,
+    ):
+        super().__init__(ttls=ttls, invalidations=invalidations)
+        self.max_size = max_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.db.commit()
+        # Running total of the cached content, so inserts only scan the table when it is exceeded
+        (self.size,) = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self.lock, self.db:
+            row = self.db.execute(
+                "SELECT url, status_code, headers, content, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            self.db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        url, status_code, headers, content, expires_at = row
+        return CachedResponse(
+            url=url, status_code=status_code, headers=json.loads(headers), content=content, expires_at=expires_at
+        )
+
+    def set(self, key: str, response: httpx.Response, ttl: int):
+        headers = {k.lower(): v for k, v in response.headers.items() if k.lower() not in EXCLUDED_HEADERS}
+        now = time.time()
+        with self.lock:
+            with self.db:
+                replaced = self.db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                self.db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        str(response.request.url),
+                        response.status_code,
+                        json.dumps(headers),
+                        response.content,
+                        len(response.content),
+                        now + ttl,
+                        now,
+                    ),
+                )
+            self.size += len(response.content) - (replaced[0] if replaced else 0)
+            if self.size > self.max_size:
+                self.evict()
+
+    def refresh(self, key: str, ttl: int):
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute("UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?", (now + ttl, now, key))
+
+    def delete_matching(self, patterns: list[re.Pattern]):
+        with self.lock:
+            rows = [
+                (key, size)
+                for key, url, size in self.db.execute("SELECT key, url, size FROM responses").fetchall()
+                if any(pattern.search(self.get_path(url)) for pattern in patterns)
+            ]
+            with self.db:
+                self.db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _ in rows])
+            self.size -= sum(size for _, size in rows)
+        if rows:
+            logger.info(f"Invalidated {len(rows)} cached responses")
+
+    def evict(self):
+        """Deletes the least recently used responses until the cache fits `max_size`, the lock must be held."""
+        # Other processes may share the file, so the running total is corrected first
+        (self.size,) = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if self.size <= self.max_size:
+            return
+        evicted = 0
+        with self.db:
+            for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+                if self.size <= self.max_size:
+                    break
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= size
+                evicted += 1
+        logger.info(f"Evicted {evicted} cached responses")
+
+    def clear(self):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM responses")
+            self.size = 0
+
+
+def get_response_cache() -> SQLiteResponseCache:
+    settings = get_settings()
+    return SQLiteResponseCache(
+        path=settings.data_path / "responses.sqlite", max_size=settings.cache_max_size_mb * 1024**2
+    )
@@ -0,0 +1,188 @@
+"""Record and replay API traffic for offline benchmarking.
+
+A cassette is a JSONL file with one request/response pair per line. It is written by a
+`Client` created with `recorder=Cassette(path)` and can be replayed either in-process
+with `ReplayTransport` or over HTTP with the stand-in server:
+
+    poetry run python -m soundcloud_tools.cassette cassette.jsonl --port 8765 --latency 0.05 --error-rate 0.05
+
+Point the client at the server with `BASE_URL=http://127.0.0.1:8765`.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import threading
+import time
+import urllib.parse as urlparse
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel
+
+from soundcloud_tools.cache import EXCLUDED_HEADERS
+
+logger = logging.getLogger(__name__)
+
+# Parameters that identify the app rather than the request, `client_id` is never written to disk
+IGNORED_PARAMS = {"client_id", "app_version", "app_locale"}
+IGNORED_HEADERS = EXCLUDED_HEADERS | {"set-cookie", "date"}
+
+
+class Interaction(BaseModel):
+    method: str
+    path: str
+    params: list[tuple[str, str]]
+    status_code: int
+    headers: dict[str, str]
+    body: str
+    recorded_at: datetime | None = None
+
+    @property
+    def key(self) -> str:
+        return make_key(self.method, self.path, self.params)
+
+    def to_response(self, request: httpx.Request | None = None) -> httpx.Response:
+        return httpx.Response(self.status_code, headers=self.headers, content=self.body.encode(), request=request)
+
+
+def make_key(method: str, path: str, params: list[tuple[str, str]]) -> str:
+    query = urlparse.urlencode(sorted((k, v) for k, v in params if k not in IGNORED_PARAMS))
+    return f"{method.upper()} /{path.strip('/')}?{query}"
+
+
+class Cassette:
+    def __init__(self, path: Path):
+        self.path = path
+        self.interactions: dict[str, list[Interaction]] = defaultdict(list)
+        self._replayed: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        if path.exists():
+            with path.open() as f:
+                for line in filter(None, map(str.strip, f)):
+                    interaction = Interaction.model_validate_json(line)
+                    self.interactions[interaction.key].append(interaction)
+            logger.info(f"Loaded {sum(map(len, self.interactions.values()))} interactions from {path}")
+
+    def record(self, response: httpx.Response):
+        url = response.request.url
+        interaction = Interaction(
+            method=response.request.method,
+            path=url.path,
+            params=[(k, v) for k, v in url.params.multi_items() if k not in IGNORED_PARAMS],
+            status_code=response.status_code,
+            headers={k.lower(): v for k, v in response.headers.items() if k.lower() not in IGNORED_HEADERS},
+            body=response.text,
+            recorded_at=datetime.now(tz=timezone.utc),
+        )
+        with self._lock:
+            self.interactions[interaction.key].append(interaction)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as f:
+                f.write(interaction.model_dump_json() + "\n")
+
+    @property
+    def recorded_at(self) -> datetime | None:
+        """When recording started, to replay time dependent requests (e.g. week windows) unchanged."""
+        times = [i.recorded_at for interactions in self.interactions.values() for i in interactions if i.recorded_at]
+        return min(times, default=None)
+
+    def find(self, method: str, path: str, params: list[tuple[str, str]]) -> Interaction | None:
+        """Returns the recorded interactions for a request in order, repeating the last one."""
+        key = make_key(method, path, params)
+        if not (interactions := self.interactions.get(key)):
+            return None
+        with self._lock:
+            index = min(self._replayed[key], len(interactions) - 1)
+            self._replayed[key] += 1
+        return interactions[index]
+
+
+class FaultInjector(BaseModel):
+    latency: float = 0.0
+    """Base latency per request in seconds, jittered by ±50%"""
+    error_rate: float = 0.0
+    """Probability of answering with a 429 instead of the recorded response"""
+    retry_after: int = 1
+
+    def get_latency(self) -> float:
+        return self.latency * random.uniform(0.5, 1.5)
+
+    def get_fault(self) -> httpx.Response | None:
+        if random.random() < self.error_rate:
+            return httpx.Response(429, headers={"Retry-After": str(self.retry_after)}, content=b"{}")
+        return None
+
+
+def not_found(method: str, path: str) -> httpx.Response:
+    logger.warning(f"No recorded interaction for {method} {path}")
+    return httpx.Response(404, json={"error": "not recorded"})
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves recorded responses in-process, without any network access."""
+
+    def __init__(self, cassette: Cassette, faults: FaultInjector | None = None):
+        self.cassette = cassette
+        self.faults = faults or FaultInjector()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.faults.get_latency())
+        if fault := self.faults.get_fault():
+            return fault
+        params = list(request.url.params.multi_items())
+        if interaction := self.cassette.find(request.method, request.url.path, params):
+            return interaction.to_response(request)
+        return not_found(request.method, request.url.path)
+
+
+def serve(cassette: Cassette, host: str = "127.0.0.1", port: int = 8765, faults: FaultInjector | None = None):
+    """Runs a local HTTP server that answers like the API from the cassette."""
+    faults = faults or FaultInjector()
+
+    class Handler(BaseHTTPRequestHandler):
+        def handle_request(self):
+            time.sleep(faults.get_latency())
+            url = urlparse.urlsplit(self.path)
+            params = urlparse.parse_qsl(url.query, keep_blank_values=True)
+            interaction = cassette.find(self.command, url.path, params)
+            response = faults.get_fault() or (interaction and interaction.to_response())
+            response = response or not_found(self.command, url.path)
+            self.send_response(response.status_code)
+            for key, value in response.headers.items():
+                if key.lower() not in IGNORED_HEADERS:
+                    self.send_header(key, value)
+            self.send_header("Content-Length", str(len(response.content)))
+            self.end_headers()
+            self.wfile.write(response.content)
+
+        do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+        def log_message(self, format: str, *args):
+            logger.info(format % args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    logger.info(f"Serving {cassette.path} on http://{host}:{port}")
+    server.serve_forever()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Serve a recorded cassette as a local stand-in for the API")
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base latency per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+    faults = FaultInjector(latency=args.latency, error_rate=args.error_rate, retry_after=args.retry_after)
+    serve(Cassette(args.cassette), host=args.host, port=args.port, faults=faults)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import logging
+import shutil
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+from pydantic import TypeAdapter
+
+from soundcloud_tools.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Checkpoints:
+    """Results of the completed stages of a run, so a failed run can be resumed.
+
+    Each stage result is stored as JSON in the run's state directory. Without `resume`
+    the state of a previous run with the same name is discarded, a completed run
+    removes its state with `clear`.
+    """
+
+    def __init__(self, name: str, resume: bool = False, path: Path | None = None):
+        self.path = path or get_settings().data_path / "state" / name
+        if not resume:
+            self.clear()
+
+    def clear(self):
+        if self.path.exists():
+            shutil.rmtree(self.path)
+
+    def get_path(self, stage: str) -> Path:
+        return self.path / f"{stage}.json"
+
+    def load(self, stage: str, type_: Any) -> Any | None:
+        path = self.get_path(stage)
+        if not path.exists():
+            return None
+        logger.info(f"Resuming from completed stage {stage}")
+        return TypeAdapter(type_).validate_json(path.read_bytes())
+
+    def save(self, stage: str, type_: Any, value: Any):
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Written completely before it replaces the previous checkpoint
+        tmp_path = self.get_path(stage).with_suffix(".tmp")
+        tmp_path.write_bytes(TypeAdapter(type_).dump_json(value))
+        tmp_path.replace(self.get_path(stage))
+
+    async def stage(self, stage: str, type_: type[T], func: Callable[[], Awaitable[T]]) -> T:
+        """Returns the stored result of `stage` or runs it and stores the result."""
+        value = self.load(stage, type_)
+        if value is None:
+            value = await func()
+            self.save(stage, type_, value)
+        return value
+
+
+async def run_stage(checkpoints: Checkpoints | None, stage: str, type_: type[T], func: Callable[[], Awaitable[T]]) -> T:
+    return await checkpoints.stage(stage, type_, func) if checkpoints else await func()
@@ -1,89 +1,232 @@
 # mypy: disable-error-code="empty-body"
+import asyncio
+import functools
 import json
 import logging
 import re
-import urllib.parse as urlparse
+import time
 import warnings
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Self, TypeVar
 
-import requests
-from pydantic import BaseModel, Field, TypeAdapter
+import httpx
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 from starlette.routing import compile_path
 
 from soundcloud_tools import models as scm
+from soundcloud_tools.cache import ResponseCache
+from soundcloud_tools.cassette import Cassette
+from soundcloud_tools.metrics import Metrics
+from soundcloud_tools.models.identity import IdentityMap
 from soundcloud_tools.models.playlist import PlaylistUpdateImageRequest, PlaylistUpdateImageResponse, UserPlaylists
 from soundcloud_tools.models.request import PlaylistCreateRequest
+from soundcloud_tools.pagination import Paginator, get_next_offset
+from soundcloud_tools.rate_limit import RETRY_STATUS_CODES, RateLimiter, RetryPolicy, get_retry_after
 from soundcloud_tools.settings import get_settings
+from soundcloud_tools.store import EntityStore
 from soundcloud_tools.utils import chunk_list, generate_random_user_agent, get_default_kwargs
 
 logger = logging.getLogger(__name__)
 warnings.filterwarnings("ignore", message="Unverified HTTPS request is being made")
 
+T = TypeVar("T")
+
+
+async def _stub(): ...
+
+
+def is_stub(func: Callable) -> bool:
+    """Whether the function body is only `...` (or a docstring), i.e. it never returns parameters."""
+    return func.__code__.co_code == _stub.__code__.co_code
+
+
+class RouteSpec(BaseModel):
+    """Everything about a route that does not change between calls, built once by `route`."""
+
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    method: str
+    path: str
+    endpoint: Callable
+    default_kwargs: dict[str, Any]
+    path_param_names: frozenset[str]
+    response_adapter: TypeAdapter | None = None
+    projection_adapters: dict[str, TypeAdapter] = Field(default_factory=dict)
+    data_adapter: TypeAdapter | None = None
+    is_stub: bool = True
+
+    @property
+    def name(self) -> str:
+        return self.endpoint.__name__
+
+    def get_response_adapter(self, projection: str | None = None) -> TypeAdapter | None:
+        if projection is None:
+            return self.response_adapter
+        if projection not in self.projection_adapters:
+            raise ValueError(f"Route {self.name} has no projection {projection!r}")
+        return self.projection_adapters[projection]
+
+    @classmethod
+    def from_endpoint(
+        cls,
+        method: str,
+        path: str,
+        endpoint: Callable,
+        response_model: Any = None,
+        projections: dict[str, Any] | None = None,
+    ) -> Self:
+        _, _, path_param_names = compile_path(path)
+        data_type = endpoint.__annotations__.get("data")
+        return cls(
+            method=method,
+            path=path,
+            endpoint=endpoint,
+            default_kwargs=get_default_kwargs(endpoint),
+            path_param_names=frozenset(path_param_names),
+            response_adapter=TypeAdapter(response_model) if response_model else None,
+            projection_adapters={name: TypeAdapter(model) for name, model in (projections or {}).items()},
+            data_adapter=TypeAdapter(data_type) if data_type else None,
+            is_stub=is_stub(endpoint),
+        )
+
 
 class SplitParams(BaseModel):
     client: Any
     path_params: dict = Field(default_factory=dict)
     query_params: dict = Field(default_factory=dict)
     data: dict | None = None
-    content: str | None = None
+    content: bytes | None = None
     kwargs: dict = Field(default_factory=dict)
 
     @classmethod
     async def from_route(cls, client: Any, endpoint: Callable, path: str, **kwargs):
-        full_kwargs = get_default_kwargs(endpoint) | kwargs
+        spec = RouteSpec.from_endpoint(method="", path=path, endpoint=endpoint)
+        return await cls.from_spec(client=client, spec=spec, **kwargs)
+
+    @classmethod
+    async def from_spec(cls, client: Any, spec: RouteSpec, **kwargs):
+        full_kwargs = spec.default_kwargs | kwargs
         params = cls(client=client)
 
-        additional_params = await endpoint(client, **kwargs) or {}
-        _, _, path_param_names = compile_path(path)
-        expected_path_params = set(path_param_names)
+        # Only endpoints with a body can contribute additional parameters
+        additional_params = {} if spec.is_stub else (await spec.endpoint(client, **kwargs) or {})
 
-        params.kwargs = full_kwargs.pop("kwargs", {})
+        params.kwargs = dict(full_kwargs.pop("kwargs", {}))
         # Use kwargs defined in endpoint
         params.kwargs.update(additional_params.pop("kwargs", {}))
         params.data = full_kwargs.pop("data", None) or additional_params.get("data")
-        if params.data and (data_type := endpoint.__annotations__.get("data")):
+        if params.data and spec.data_adapter:
             # Store the data as a JSON String, in order to get the validation
             # benefits from the TypeAdapter
-            params.content = TypeAdapter(data_type).dump_json(params.data)
-        params.path_params = {k: v for k, v in full_kwargs.items() if k in expected_path_params}
-        params.query_params = {k: v for k, v in full_kwargs.items() if k not in expected_path_params}
+            params.content = spec.data_adapter.dump_json(params.data)
+        params.path_params = {k: v for k, v in full_kwargs.items() if k in spec.path_param_names}
+        params.query_params = {k: v for k, v in full_kwargs.items() if k not in spec.path_param_names}
         params.query_params.update(additional_params.get("query", {}))
         # If query params are passed as a dict, move them to the query_params
         params.query_params.update(params.query_params.pop("params", {}))
         return params
 
 
-def route(method: str, path: str, response_model: BaseModel | None = None):
+def is_json_error(error: ValidationError) -> bool:
+    return any(e["type"] == "json_invalid" for e in error.errors())
+
+
+def log_decode_error(response: httpx.Response):
+    logger.error(f"Failed to decode response (status: {response.status_code})\n{response.text}")
+
+
+class TrackLookup(BaseModel):
+    tracks: list[scm.Track]
+    missing: list[int]
+
+
+def route(method: str, path: str, response_model: Any = None, projections: dict[str, Any] | None = None):
+    """Turns an endpoint stub into a request method.
+
+    `projections` are alternative response models by name, a caller selects one with
+    `projection=<name>` to validate into a slimmer model than `response_model`.
+    """
+
     def wrapper(endpoint_func):
-        async def caller(self, **kwargs):
-            split_params = await SplitParams.from_route(client=self, endpoint=endpoint_func, path=path, **kwargs)
-            url = self.make_url(path, **split_params.path_params)
+        spec = RouteSpec.from_endpoint(method, path, endpoint_func, response_model, projections)
+
+        @functools.wraps(endpoint_func)
+        async def caller(self, projection: str | None = None, **kwargs):
+            response_adapter = spec.get_response_adapter(projection)
+            split_params = await SplitParams.from_spec(client=self, spec=spec, **kwargs)
+            url = self.make_url(spec.path, **split_params.path_params)
             params = self.json_dump(split_params.query_params)
             logger.info(f"Making request to {url}")
-            response = await self.make_request(
-                method,
-                url,
-                data=split_params.content,
-                params=params,
-                **split_params.kwargs,
-            )
-            try:
-                response_data = response.json()
-            except json.decoder.JSONDecodeError:
-                logger.error(f"Failed to decode response (status: {response.status_code})\n{response.content}")
-                return
-            if not response_model:
-                return response_data
-            return TypeAdapter(response_model).validate_python(response_data)
-
+            with self.metrics.span(f"route.{spec.name}", method=spec.method, url=url):
+                start = time.perf_counter()
+                response = await self.make_request(
+                    spec.method,
+                    url,
+                    content=split_params.content,
+                    params=params,
+                    **split_params.kwargs,
+                )
+                self.metrics.record_request(
+                    spec.name, time.perf_counter() - start, len(response.content), response.status_code
+                )
+                if response.status_code in RETRY_STATUS_CODES:
+                    # Retries are exhausted, fail loudly instead of handing `None` to the caller
+                    response.raise_for_status()
+                if not response_adapter:
+                    try:
+                        return response.json()
+                    except json.decoder.JSONDecodeError:
+                        log_decode_error(response)
+                        return
+                # Validate the raw bytes directly, skipping the intermediate Python objects of `response.json()`
+                start = time.perf_counter()
+                try:
+                    result = response_adapter.validate_json(response.content)
+                    # Entities repeat within and across pages, share one instance per entity for the session
+                    result = self.identity_map.intern(result)
+                except ValidationError as e:
+                    if not is_json_error(e):
+                        raise
+                    log_decode_error(response)
+                    return
+                finally:
+                    self.metrics.record_validation(spec.name, time.perf_counter() - start)
+                if self.store:
+                    # Runs in a worker thread, so concurrent requests are not blocked by the sqlite writes
+                    user_id = split_params.path_params.get("user_id")
+                    await asyncio.to_thread(self.store.add_response, result, user_id=user_id)
+                return result
+
+        caller.spec = spec  # type: ignore[attr-defined]
         return caller
 
     return wrapper
 
 
 class Client:
-    def __init__(self, base_url: str = get_settings().base_url):
+    def __init__(
+        self,
+        base_url: str = get_settings().base_url,
+        http2: bool = get_settings().http2,
+        max_connections_per_host: int = get_settings().max_connections_per_host,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        cache: ResponseCache | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        recorder: Cassette | None = None,
+        metrics: Metrics | None = None,
+        store: EntityStore | None = None,
+    ):
         self.base_url = base_url
+        self.http2 = http2
+        self.max_connections_per_host = max_connections_per_host
+        self.rate_limiter = rate_limiter or RateLimiter(rate=get_settings().rate_limit)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=get_settings().max_retries)
+        self.cache = cache
+        self.transport = transport
+        self.recorder = recorder
+        self.metrics = metrics or Metrics()
+        self.store = store
+        self.identity_map = IdentityMap()
         self.headers = {
             "Authorization": f"OAuth {get_settings().oauth_token}",
             "User-Agent": generate_random_user_agent(),
@@ -94,22 +237,140 @@ class Client:
             "app_version": "1739181955",
             "app_locale": "en",
         }
-        self.proxies = {"https://": "https://" + get_settings().proxy} if get_settings().proxy else {}
+        self.proxy = "https://" + get_settings().proxy if get_settings().proxy else None
+        self._http: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.aclose()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # A pooled client is bound to the event loop it was created in, so callers
+        # that use `asyncio.run` per request (e.g. Streamlit) get a fresh pool per loop.
+        # The pool of a finished loop can't be closed from another loop, use `run`
+        # to close it before its loop finishes.
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            if self._http is not None:
+                logger.debug("Dropping the connection pool of a previous event loop")
+            self._http = self.create_http_client()
+            self._loop = loop
+            self._host_slots = {}
+        return self._http
+
+    def host_slot(self, url: str) -> asyncio.Semaphore:
+        """Limits the number of in-flight requests per host."""
+        host = httpx.URL(url).host
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_slots[host]
+
+    def create_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=self.http2,
+            transport=self.transport,
+            # httpx routes every request through the proxy's transport instead of an explicit one
+            proxy=None if self.transport else self.proxy,
+            verify=False,
+            follow_redirects=True,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+        )
+
+    async def aclose(self):
+        if self._http is not None and self._loop is asyncio.get_running_loop():
+            await self._http.aclose()
+        self._http = None
+        self._loop = None
+
+    def run(self, awaitable: Awaitable[T]) -> T:
+        """Runs `awaitable` in a new event loop and closes the connection pool before the loop finishes.
+
+        For synchronous callers like Streamlit, which start a new event loop for every call.
+        """
+
+        async def main() -> T:
+            try:
+                return await awaitable
+            finally:
+                await self.aclose()
+
+        return asyncio.run(main())
 
     def json_dump(self, data: Any):
         return data if not isinstance(data, BaseModel) else data.model_dump(mode="json")
 
-    async def make_request(self, method: str, url: str, **kwargs):
-        kwargs["params"] = kwargs.get("params", {}) | self.params
+    async def make_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        params = kwargs.get("params", {}) | self.params
+        kwargs["params"] = {k: v for k, v in params.items() if v is not None}
         kwargs["headers"] = kwargs.get("headers", {}) | self.headers
-        if get_settings().proxy:
-            kwargs.setdefault("proxies", self.proxies)
-        kwargs.setdefault("verify", False)
-        logger.info(f"Making request {method} {url}")
-        response = requests.request(method, url, **kwargs)
-        logger.info(f"Response {response.status_code} for {method} {response.url}")
+        if self.cache is None:
+            return await self.send_request(method, url, **kwargs)
+        # The sqlite reads and writes of the cache run in worker threads, off the event loop
+        if method.upper() != "GET":
+            response = await self.send_request(method, url, **kwargs)
+            if response.is_success:
+                await asyncio.to_thread(self.cache.invalidate, url)
+            return response
+
+        if (ttl := self.cache.get_ttl(url)) <= 0:
+            return await self.send_request(method, url, **kwargs)
+        key = self.cache.make_key(method, url, kwargs["params"])
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached and cached.is_fresh and not self.cache.must_revalidate(kwargs["headers"]):
+            logger.info(f"Using cached response for {method} {url}")
+            return cached.to_response(method)
+        if cached:
+            kwargs["headers"] |= cached.validators
+        response = await self.send_request(method, url, **kwargs)
+        if cached and response.status_code == 304:
+            logger.info(f"Revalidated cached response for {method} {url}")
+            await asyncio.to_thread(self.cache.refresh, key, ttl)
+            return cached.to_response(method)
+        if response.is_success:
+            await asyncio.to_thread(self.cache.set, key, response, ttl)
         return response
 
+    async def send_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        http = self.http
+        async with self.host_slot(url):
+            attempt = 0
+            while True:
+                await self.rate_limiter.acquire()
+                logger.info(f"Making request {method} {url}")
+                try:
+                    response = await http.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    if attempt >= self.retry_policy.max_retries or not self.retry_policy.should_retry_error(method, e):
+                        raise
+                    delay = self.retry_policy.get_delay(attempt)
+                    logger.warning(f"Request failed ({e!r}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                logger.info(f"Response {response.status_code} for {method} {response.url}")
+                retry_after = get_retry_after(response)
+                if response.status_code == 429:
+                    self.rate_limiter.on_rate_limited(retry_after)
+                else:
+                    self.rate_limiter.on_success()
+                if attempt >= self.retry_policy.max_retries or not self.retry_policy.should_retry(method, response):
+                    if self.recorder:
+                        self.recorder.record(response)
+                    return response
+                delay = self.retry_policy.get_delay(attempt, retry_after)
+                logger.warning(
+                    f"Response {response.status_code}, retrying in {delay:.1f}s "
+                    f"({attempt + 1}/{self.retry_policy.max_retries})"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
     def _make_request(self, *arg, **kwargs):
         return self.make_request(*arg, **kwargs)
 
@@ -118,11 +379,11 @@ class Client:
 
     @staticmethod
     def get_next_offset(href: str | None) -> str | None:
-        if not href:
-            return None
-        parsed = urlparse.urlparse(href)
-        offset = urlparse.parse_qs(parsed.query).get("offset") or None
-        return offset and offset[0]
+        return get_next_offset(href)
+
+    def paginate(self, endpoint: Callable, **kwargs) -> Paginator:
+        """Iterates over all pages of a paginated route method, see `Paginator`."""
+        return Paginator(endpoint, **kwargs)
 
     async def get_track_id(self, url: str) -> int | None:
         regex = r'content="soundcloud://sounds:(\d+)"'
@@ -136,7 +397,10 @@ class Client:
     @route("GET", "playlists/{playlist_id}", response_model=scm.Playlist)
     async def get_playlist(self, playlist_id: int, show_tracks: bool = True): ...
 
-    @route("GET", "users/{user_id}/likes", response_model=scm.Likes)
+    @route("GET", "users/{user_id}", response_model=scm.User)
+    async def get_user(self, user_id: int) -> scm.User: ...
+
+    @route("GET", "users/{user_id}/likes", response_model=scm.Likes, projections={"core": scm.LikesCore})
     async def get_user_likes(
         self,
         user_id: int,
@@ -154,7 +418,7 @@ class Client:
         threaded: int = 0,
     ): ...
 
-    @route("GET", "stream/users/{user_id}/reposts", response_model=scm.Reposts)
+    @route("GET", "stream/users/{user_id}/reposts", response_model=scm.Reposts, projections={"core": scm.RepostsCore})
     async def get_user_reposts(
         self,
         user_id: int,
@@ -172,7 +436,7 @@ class Client:
     @route("GET", "tracks/{track_id}", response_model=scm.Track)
     async def get_track(self, track_id: int): ...
 
-    @route("GET", "stream", response_model=scm.Stream)
+    @route("GET", "stream", response_model=scm.Stream, projections={"core": scm.StreamCore})
     async def get_stream(
         self,
         user_urn: str,
@@ -183,7 +447,7 @@ class Client:
         linked_partitioning: bool = True,
     ): ...
 
-    @route("GET", "search", response_model=scm.Search)
+    @route("GET", "search", response_model=scm.Search, projections={"core": scm.SearchCore})
     async def search(self, q: str, limit: int = 20, offset: int = 0): ...
 
     @route("GET", "me/artist-shortcuts", response_model=scm.ArtistShortcuts)
@@ -213,9 +477,24 @@ class Client:
     def prepare_track_ids(ids: list[int]) -> str:
         return ",".join(map(str, ids))
 
-    async def get_all_tracks(self, track_ids: list[int], chunk_size: int = 30) -> list[scm.Track]:
-        return [
-            track
-            for track_ids_chunk in chunk_list(track_ids, n=chunk_size)
-            for track in await self.get_tracks(ids=self.prepare_track_ids(track_ids_chunk))
-        ]
+    async def fetch_tracks(self, track_ids: list[int], chunk_size: int = 50, concurrency: int = 4) -> TrackLookup:
+        """Fetches tracks in concurrent chunks, keeping the order of `track_ids`."""
+        semaphore = asyncio.Semaphore(concurrency)
+        unique_ids = list(dict.fromkeys(track_ids))
+
+        async def fetch_chunk(ids: list[int]) -> list[scm.Track]:
+            async with semaphore:
+                return await self.get_tracks(ids=self.prepare_track_ids(ids)) or []
+
+        chunks = await asyncio.gather(*(fetch_chunk(ids) for ids in chunk_list(unique_ids, n=chunk_size)))
+        tracks_by_id = {track.id: track for chunk in chunks for track in chunk}
+        return TrackLookup(
+            tracks=[tracks_by_id[track_id] for track_id in unique_ids if track_id in tracks_by_id],
+            missing=[track_id for track_id in unique_ids if track_id not in tracks_by_id],
+        )
+
+    async def get_all_tracks(self, track_ids: list[int], chunk_size: int = 50, concurrency: int = 4) -> list[scm.Track]:
+        lookup = await self.fetch_tracks(track_ids, chunk_size=chunk_size, concurrency=concurrency)
+        if lookup.missing:
+            logger.warning(f"Could not fetch {len(lookup.missing)} missing or private tracks: {lookup.missing}")
+        return lookup.tracks
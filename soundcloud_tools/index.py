@@ -0,0 +1,198 @@
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from soundcloud_tools.cache import NO_CACHE
+from soundcloud_tools.client import Client
+from soundcloud_tools.models.core import LikeCore
+from soundcloud_tools.models.playlist import Playlist
+from soundcloud_tools.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_weekly_playlist(playlist: Playlist) -> bool:
+    return "weekly favorites" in playlist.title.lower()
+
+
+class IDIndex:
+    """Sorted set of IDs stored as a compact int64 array, lookups are a binary search."""
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self.ids = array("q", sorted(set(ids)))
+
+    def __contains__(self, id: object) -> bool:
+        if not isinstance(id, int):
+            return False
+        i = bisect_left(self.ids, id)
+        return i < len(self.ids) and self.ids[i] == id
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+    def add(self, ids: Iterable[int]) -> int:
+        """Adds IDs to the index and returns the number of new ones."""
+        new_ids = {id for id in ids if id not in self}
+        if new_ids:
+            self.ids = array("q", sorted([*self.ids, *new_ids]))
+        return len(new_ids)
+
+    @classmethod
+    def load(cls, path: Path) -> "IDIndex":
+        """Loads IDs written with `save` or appended as raw int64 values in any order."""
+        ids = array("q")
+        if path.exists():
+            ids.frombytes(path.read_bytes())
+        return cls(ids)
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.ids.tobytes())
+
+
+class SeenIndexState(BaseModel):
+    playlist_ids: set[int] = set()
+    """Weekly playlists whose tracks are indexed"""
+
+
+class SeenTrackIndex:
+    """Append-only index of all track IDs published in a user's weekly playlists.
+
+    IDs are appended to a log of int64 values whenever a playlist is posted, the sorted
+    index is built from it on load. `backfill` adds the weekly playlists that were not
+    posted through the index, e.g. before it existed.
+    """
+
+    def __init__(self, user_id: int, path: Path | None = None):
+        self.user_id = user_id
+        self.path = path or get_settings().data_path / "index" / f"seen-{user_id}"
+        self.ids = IDIndex.load(self.path.with_suffix(".ids"))
+        state_path = self.path.with_suffix(".json")
+        self.state = SeenIndexState.model_validate_json(state_path.read_text()) if state_path.exists() else None
+
+    def add(self, track_ids: Iterable[int], playlist_id: int | None = None):
+        new_ids = array("q", (id for id in dict.fromkeys(track_ids) if id not in self.ids))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.with_suffix(".ids").open("ab") as f:
+            new_ids.tofile(f)
+        self.ids.add(new_ids)
+        self.state = self.state or SeenIndexState()
+        if playlist_id is not None:
+            self.state.playlist_ids.add(playlist_id)
+        self.path.with_suffix(".json").write_text(self.state.model_dump_json())
+        logger.info(f"Added {len(new_ids)} seen tracks to the index (total = {len(self.ids)})")
+
+    async def backfill(self, client: Client, concurrency: int = 4, recent: int | None = None):
+        """Indexes the tracks of all weekly playlists of the user that are not indexed yet.
+
+        With `recent`, only the user's latest `recent` playlists are checked with a single request.
+        """
+        known = self.state.playlist_ids if self.state else set()
+        if recent:
+            playlists = (await client.get_user_playlists(user_id=self.user_id, limit=recent)).collection
+        else:
+            playlists = await client.paginate(client.get_user_playlists, user_id=self.user_id, limit=50).collect()
+        playlist_ids = [
+            playlist.id
+            for playlist in playlists
+            if isinstance(playlist, Playlist) and is_weekly_playlist(playlist) and playlist.id not in known
+        ]
+        logger.info(f"Backfilling seen tracks from {len(playlist_ids)} weekly playlists")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(playlist_id: int) -> Playlist:
+            async with semaphore:
+                return await client.get_playlist(playlist_id=playlist_id)
+
+        for playlist in await asyncio.gather(*map(fetch, playlist_ids)):
+            self.add((track.id for track in playlist.tracks), playlist_id=playlist.id)
+        if self.state is None:
+            self.add([])
+
+    async def sync(self, client: Client) -> IDIndex:
+        # The local index can miss posted playlists, e.g. if a run's data was not kept,
+        # so the latest playlists are reconciled on every sync
+        await self.backfill(client, recent=None if self.state is None else 50)
+        return self.ids
+
+
+class LikedIndexState(BaseModel):
+    head: datetime | None = None
+    """Creation time of the newest indexed like"""
+    remote_count: int | None = None
+    """Track likes count of the user as reported by the API at the last sync"""
+
+
+class LikedTrackIndex:
+    """Persisted index of a user's liked track IDs, synced incrementally.
+
+    A sync only pages through the likes newer than the stored head. If the user's likes
+    count does not match the stored count plus the new likes, e.g. because tracks were
+    unliked, the index is rebuilt from all likes.
+    """
+
+    def __init__(self, user_id: int, path: Path | None = None):
+        self.user_id = user_id
+        self.path = path or get_settings().data_path / "index" / f"likes-{user_id}"
+        self.ids = IDIndex.load(self.path.with_suffix(".ids"))
+        state_path = self.path.with_suffix(".json")
+        self.state = LikedIndexState.model_validate_json(state_path.read_text()) if state_path.exists() else None
+
+    def save(self):
+        self.ids.save(self.path.with_suffix(".ids"))
+        self.path.with_suffix(".json").write_text(self.state.model_dump_json())
+
+    async def fetch_likes(self, client: Client, after: datetime | None = None) -> list[LikeCore]:
+        likes: list[LikeCore] = []
+        pages = client.paginate(
+            client.get_user_likes,
+            # Likes are ordered newest first
+            until=lambda response: after is not None and any(like.created_at <= after for like in response.collection),
+            user_id=self.user_id,
+            limit=200,
+            projection="core",
+            kwargs={"headers": NO_CACHE},
+        )
+        async for response in pages:
+            likes += [
+                like
+                for like in response.collection
+                if like.track is not None and (after is None or like.created_at > after)
+            ]
+        return likes
+
+    async def resync(self, client: Client, remote_count: int | None):
+        likes = await self.fetch_likes(client)
+        self.ids = IDIndex(like.track.id for like in likes if like.track)
+        self.state = LikedIndexState(
+            head=max((like.created_at for like in likes), default=None), remote_count=remote_count
+        )
+        logger.info(f"Indexed {len(self.ids)} liked tracks")
+
+    async def sync(self, client: Client) -> IDIndex:
+        # The likes count and the new likes are compared, both must be current instead of cached
+        user = await client.get_user(user_id=self.user_id, kwargs={"headers": NO_CACHE})
+        if self.state is None or self.state.head is None:
+            await self.resync(client, remote_count=user.likes_count)
+        else:
+            likes = await self.fetch_likes(client, after=self.state.head)
+            expected_count = (self.state.remote_count or 0) + len(likes)
+            if user.likes_count is not None and user.likes_count != expected_count:
+                logger.warning(f"Likes count changed to {user.likes_count} instead of {expected_count}, resyncing")
+                await self.resync(client, remote_count=user.likes_count)
+            else:
+                added = self.ids.add(like.track.id for like in likes if like.track)
+                self.state.head = max([self.state.head, *(like.created_at for like in likes)])
+                self.state.remote_count = user.likes_count
+                logger.info(f"Added {added} new liked tracks to the index (total = {len(self.ids)})")
+        self.save()
+        return self.ids
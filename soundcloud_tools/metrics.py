@@ -0,0 +1,109 @@
+import json
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - optional dependency
+    trace = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class RouteMetrics(BaseModel):
+    requests: int = 0
+    errors: int = 0
+    bytes: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    latency_histogram: dict[str, int] = Field(default_factory=lambda: {f"le_{b}": 0 for b in LATENCY_BUCKETS})
+    validation_total: float = 0.0
+
+    @property
+    def latency_mean(self) -> float:
+        return self.latency_total / self.requests if self.requests else 0.0
+
+    def observe_latency(self, seconds: float):
+        self.latency_total += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        bucket = next(b for b in LATENCY_BUCKETS if seconds <= b)
+        self.latency_histogram[f"le_{bucket}"] += 1
+
+
+class PhaseTiming(BaseModel):
+    name: str
+    started_at: datetime
+    duration: float
+
+
+class Metrics:
+    """Collects per-route request metrics and phase timings of a run.
+
+    If `opentelemetry` is installed, phases and requests are also emitted as spans
+    to the globally configured tracer provider.
+    """
+
+    def __init__(self):
+        self.routes: dict[str, RouteMetrics] = {}
+        self.phases: list[PhaseTiming] = []
+        self.tracer = trace.get_tracer("soundcloud_tools") if trace else None
+
+    def route(self, name: str) -> RouteMetrics:
+        if name not in self.routes:
+            self.routes[name] = RouteMetrics()
+        return self.routes[name]
+
+    def record_request(self, route: str, seconds: float, size: int, status_code: int):
+        metrics = self.route(route)
+        metrics.requests += 1
+        metrics.errors += status_code >= 400
+        metrics.bytes += size
+        metrics.observe_latency(seconds)
+
+    def record_validation(self, route: str, seconds: float):
+        self.route(route).validation_total += seconds
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[None]:
+        if self.tracer is None:
+            yield
+            return
+        with self.tracer.start_as_current_span(name, attributes=attributes):
+            yield
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started_at = datetime.now(tz=timezone.utc)
+        start = time.perf_counter()
+        try:
+            with self.span(f"phase.{name}"):
+                yield
+        finally:
+            duration = time.perf_counter() - start
+            self.phases.append(PhaseTiming(name=name, started_at=started_at, duration=duration))
+            logger.info(f"Phase {name} took {duration:.2f}s")
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "routes": {
+                name: metrics.model_dump() | {"latency_mean": metrics.latency_mean}
+                for name, metrics in sorted(self.routes.items())
+            },
+            "phases": [phase.model_dump(mode="json") for phase in self.phases],
+            "totals": {
+                "requests": sum(m.requests for m in self.routes.values()),
+                "bytes": sum(m.bytes for m in self.routes.values()),
+                "duration": sum(p.duration for p in self.phases),
+            },
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.report(), **kwargs)
@@ -1,11 +1,13 @@
 from soundcloud_tools.models.artist_shortcut import ArtistShortcuts, ArtistShortcutStories
 from soundcloud_tools.models.comment import Comments
+from soundcloud_tools.models.core import LikesCore, RepostsCore, SearchCore, StreamCore
 from soundcloud_tools.models.following import Followings
 from soundcloud_tools.models.like import Likes
 from soundcloud_tools.models.playlist import Playlist
 from soundcloud_tools.models.repost import Reposts
 from soundcloud_tools.models.search import Search
 from soundcloud_tools.models.stream import Stream
+from soundcloud_tools.models.table import TrackTable
 from soundcloud_tools.models.track import Track
 from soundcloud_tools.models.user import User
 
@@ -18,7 +20,12 @@ __all__ = [
     "Search",
     "Stream",
     "Track",
+    "TrackTable",
     "User",
     "Comments",
     "Followings",
+    "LikesCore",
+    "RepostsCore",
+    "SearchCore",
+    "StreamCore",
 ]
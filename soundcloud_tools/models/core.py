@@ -0,0 +1,97 @@
+"""Projections of the API models with only the fields read on hot paths.
+
+Unknown fields are ignored, so validating a page into a projection skips the nested
+media, visuals and publisher metadata of every item. Select them per call with
+`projection="core"` on routes that declare them.
+"""
+
+from datetime import datetime
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+from soundcloud_tools.models.identity import Interned
+
+
+class UserCore(Interned):
+    id: int
+    kind: Literal["user"] = "user"
+    username: str
+    urn: str | None = None
+    followers_count: int | None = None
+
+
+class TrackCore(Interned):
+    id: int
+    kind: Literal["track"] = "track"
+    title: str | None = None
+    genre: str | None = None
+    duration: int | None = None
+    """Duration in milliseconds, unknown for slim tracks"""
+    created_at: datetime | None = None
+    playback_count: int | None = None
+    likes_count: int | None = None
+    reposts_count: int | None = None
+    user: UserCore | None = None
+
+    @property
+    def duration_s(self) -> int:
+        return (self.duration or 0) // 1000
+
+
+class PlaylistCore(BaseModel):
+    id: int
+    kind: Literal["playlist"] = "playlist"
+    title: str
+    tracks: list[TrackCore] = []
+
+
+class StreamItemCore(BaseModel):
+    created_at: datetime
+    type: str
+    uuid: str
+    user: UserCore
+    track: TrackCore | None = None
+    playlist: PlaylistCore | None = None
+
+
+class StreamCore(BaseModel):
+    collection: list[StreamItemCore]
+    next_href: str | None
+    query_urn: str | None = None
+
+
+class LikeCore(BaseModel):
+    created_at: datetime
+    track: TrackCore | None = None
+    playlist: PlaylistCore | None = None
+
+
+class LikesCore(BaseModel):
+    collection: list[LikeCore]
+    next_href: str | None = None
+    query_urn: str | None = None
+
+
+class RepostCore(BaseModel):
+    created_at: datetime
+    type: str
+    user: UserCore
+    track: TrackCore | None = None
+    playlist: PlaylistCore | None = None
+
+
+class RepostsCore(BaseModel):
+    collection: list[RepostCore]
+    next_href: str | None = None
+    query_urn: str | None = None
+
+
+SearchItemCore = Annotated[PlaylistCore | TrackCore | UserCore, Field(discriminator="kind")]
+
+
+class SearchCore(BaseModel):
+    collection: list[SearchItemCore]
+    next_href: str | None = None
+    query_urn: str | None = None
+    total_results: int
@@ -0,0 +1,88 @@
+"""Identity map that shares one model instance per entity across the responses of a client.
+
+Pages repeat the same users and tracks many times (e.g. the reposter and owner of
+every stream item), and later pages and responses repeat them again. After a response
+is validated, `IdentityMap.intern` replaces every entity by the shared instance of its
+`id`, so repeated copies are dropped instead of stored. Interning runs as one pass over
+the validated models, which keeps validation itself on the `validate_json` fast path.
+
+The first occurrence of an entity in a response refreshes the shared instance in place,
+so instances always hold the data of the latest response. Instances are held weakly,
+so the map never keeps entities alive that nobody references anymore.
+"""
+
+import functools
+import weakref
+from typing import Any, TypeVar, get_args
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Interned(BaseModel):
+    """Entities with an `id` that are shared through an identity map."""
+
+    id: int
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.id))
+
+
+def holds_entities(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return issubclass(annotation, Interned) or bool(get_entity_fields(annotation))
+    return any(holds_entities(arg) for arg in get_args(annotation))
+
+
+@functools.cache
+def get_entity_fields(model: type[BaseModel]) -> tuple[str, ...]:
+    """Fields of `model` that can hold entities, the only ones interning has to visit."""
+    return tuple(name for name, field in model.model_fields.items() if holds_entities(field.annotation))
+
+
+class IdentityMap:
+    """Shared instances by model and `id`."""
+
+    def __init__(self):
+        self.instances: weakref.WeakValueDictionary[tuple[type, int], Interned] = weakref.WeakValueDictionary()
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    def intern(self, value: T) -> T:
+        """Replaces the entities in a validated response by their shared instances."""
+        return self._intern(value, seen={})
+
+    def _intern(self, value: Any, seen: dict[tuple[type, int], Interned]) -> Any:
+        """`seen` holds the entities already interned for this response."""
+        if isinstance(value, Interned):
+            key = (type(value), value.id)
+            if (instance := seen.get(key)) is not None:
+                self.hits += 1
+                return instance
+            self._intern_fields(value, seen)
+            instance = self.instances.get(key)
+            if instance is None:
+                self.instances[key] = instance = value
+            else:
+                self.hits += 1
+                instance.__dict__.update(value.__dict__)
+                object.__setattr__(instance, "__pydantic_fields_set__", value.model_fields_set)
+            seen[key] = instance
+            return instance
+        if isinstance(value, BaseModel):
+            self._intern_fields(value, seen)
+        elif isinstance(value, list):
+            value[:] = [self._intern(item, seen) for item in value]
+        return value
+
+    def _intern_fields(self, model: BaseModel, seen: dict[tuple[type, int], Interned]):
+        fields = model.__dict__
+        for name in get_entity_fields(type(model)):
+            if (field := fields[name]) is not None:
+                fields[name] = self._intern(field, seen)
@@ -0,0 +1,164 @@
+"""Columnar view of track collections for vectorized filtering, sorting and dedup.
+
+Items are tracks or collection items holding a track (likes, reposts, stream items),
+items without a track (e.g. playlist reposts) are skipped. Each column is a NumPy
+array aligned with `items`, so operations select rows by index instead of copying
+models, and `to_pandas` wraps the arrays without dumping every model.
+"""
+
+import re
+import sys
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Self
+
+import numpy as np
+
+from soundcloud_tools.models.core import LikeCore, TrackCore
+from soundcloud_tools.models.like import BaseLike
+from soundcloud_tools.models.track import Track
+
+type TableTrack = Track | TrackCore
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+NAT = np.iinfo(np.int64).min
+
+
+def get_track(item: Any) -> TableTrack | None:
+    return item if isinstance(item, Track | TrackCore) else getattr(item, "track", None)
+
+
+def get_type(item: Any) -> str:
+    if isinstance(item, Track | TrackCore):
+        return "track"
+    if isinstance(item, BaseLike | LikeCore):
+        return "like"
+    return item.type
+
+
+def to_datetime64(value: datetime | date | None) -> np.datetime64:
+    if value is None:
+        return np.datetime64("NaT", "us")
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+def to_microseconds(values: Iterable[datetime | None]) -> np.ndarray:
+    """Converts aware datetimes to a naive UTC `datetime64[us]` column."""
+    micros = [NAT if value is None else (value - EPOCH) // MICROSECOND for value in values]
+    return np.array(micros, dtype=np.int64).view("datetime64[us]")
+
+
+def to_strings(values: Iterable[str | None]) -> np.ndarray:
+    return np.array([sys.intern(value or "") for value in values], dtype=object)
+
+
+def to_counts(values: Iterable[int | None]) -> np.ndarray:
+    return np.array([value or 0 for value in values], dtype=np.int64)
+
+
+class TrackTable:
+    """Tracks of a collection as typed columns aligned with the source `items`.
+
+    `added_at` is when the item entered the collection (liked, reposted, posted) and
+    the upload time for bare tracks. Datetimes are naive UTC, missing strings are empty
+    and missing counts 0.
+    """
+
+    def __init__(self, items: np.ndarray, columns: dict[str, np.ndarray]):
+        self.items = items
+        self.columns = columns
+
+    @classmethod
+    def from_items(cls, items: Iterable[Any]) -> Self:
+        pairs = [(item, track) for item in items if (track := get_track(item)) is not None]
+        # `fromiter` stores the models as is, without probing each one for the array protocol
+        items_array = np.fromiter((item for item, _ in pairs), dtype=object, count=len(pairs))
+        tracks = [track for _, track in pairs]
+        users = [track.user for track in tracks]
+        columns = {
+            "id": np.array([track.id for track in tracks], dtype=np.int64),
+            "title": to_strings(track.title for track in tracks),
+            "artist": to_strings(
+                track.artist if isinstance(track, Track) else None if user is None else user.username
+                for track, user in zip(tracks, users)
+            ),
+            "genre": to_strings(track.genre for track in tracks),
+            "type": to_strings(get_type(item) for item, _ in pairs),
+            "added_at": to_microseconds(
+                track.created_at if item is track else item.created_at for item, track in pairs
+            ),
+            "created_at": to_microseconds(track.created_at for track in tracks),
+            "duration": to_counts(track.duration for track in tracks),
+            "playback_count": to_counts(track.playback_count for track in tracks),
+            "likes_count": to_counts(track.likes_count for track in tracks),
+            "reposts_count": to_counts(track.reposts_count for track in tracks),
+            "followers_count": to_counts(None if user is None else user.followers_count for user in users),
+        }
+        return cls(items_array, columns)
+
+    @classmethod
+    def concat(cls, tables: Sequence["TrackTable"]) -> Self:
+        if not tables:
+            return cls.from_items([])
+        return cls(
+            np.concatenate([t.items for t in tables]),
+            {name: np.concatenate([t[name] for t in tables]) for name in tables[0].columns},
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def tracks(self) -> list[TableTrack]:
+        return [get_track(item) for item in self.items]  # type: ignore[misc]
+
+    def track_at(self, row: int) -> TableTrack:
+        return get_track(self.items[row])  # type: ignore[return-value]
+
+    def take(self, indices: np.ndarray) -> Self:
+        return type(self)(self.items[indices], {name: values[indices] for name, values in self.columns.items()})
+
+    def filter(self, mask: np.ndarray) -> Self:
+        return self.take(np.flatnonzero(mask))
+
+    def sort(self, column: str, descending: bool = False) -> Self:
+        """Stable sort, ties keep their order in both directions."""
+        values = self[column]
+        if not descending:
+            return self.take(np.argsort(values, kind="stable"))
+        # Sorting the reversed column keeps ties in their original order once reversed back
+        return self.take(len(values) - 1 - np.argsort(values[::-1], kind="stable")[::-1])
+
+    def dedup(self, column: str = "id") -> Self:
+        """Keeps the first row of each value in `column`."""
+        _, first = np.unique(self[column], return_index=True)
+        return self.take(np.sort(first))
+
+    def isin(self, column: str, values: Iterable[Any]) -> np.ndarray:
+        return np.isin(self[column], np.fromiter(values, dtype=self[column].dtype))
+
+    def between(self, column: str, start: date, end: date) -> np.ndarray:
+        """Rows on the days from `start` to `end`, both included."""
+        values = self[column]
+        return (values >= to_datetime64(start)) & (values < to_datetime64(end) + np.timedelta64(1, "D"))
+
+    def matches(self, pattern: str, columns: Sequence[str] = ("title", "artist")) -> np.ndarray:
+        """Case insensitive regex search, evaluated once per distinct string."""
+        regex = re.compile(pattern, flags=re.IGNORECASE)
+        mask = np.zeros(len(self), dtype=bool)
+        for column in columns:
+            uniques, inverse = np.unique(self[column].astype(str), return_inverse=True)
+            mask |= np.array([bool(regex.search(value)) for value in uniques], dtype=bool)[inverse]
+        return mask
+
+    def to_pandas(self):
+        """DataFrame of the columns, numeric and datetime columns are not copied."""
+        import pandas as pd
+
+        return pd.DataFrame(self.columns, copy=False)
@@ -3,6 +3,7 @@ from typing import Any, Literal
 
 from pydantic import BaseModel
 
+from soundcloud_tools.models.identity import Interned
 from soundcloud_tools.models.user import User
 
 type TrackID = int
@@ -57,7 +58,7 @@ class TrackSlim(BaseModel):
     policy: str
 
 
-class Track(BaseModel):
+class Track(Interned):
     artwork_url: str | None
     caption: str | None
     commentable: bool
@@ -3,6 +3,8 @@ from typing import Literal
 
 from pydantic import BaseModel
 
+from soundcloud_tools.models.identity import Interned
+
 
 class Badges(BaseModel):
     pro: bool
@@ -11,7 +13,7 @@ class Badges(BaseModel):
     verified: bool
 
 
-class User(BaseModel):
+class User(Interned):
     avatar_url: str
     first_name: str
     followers_count: int
@@ -31,6 +33,7 @@ class User(BaseModel):
     badges: Badges
     station_urn: str
     station_permalink: str
+    likes_count: int | None = None
 
     @property
     def hq_avatar_url(self) -> str | None:
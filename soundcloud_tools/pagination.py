@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import urllib.parse as urlparse
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def get_next_offset(href: str | None) -> str | None:
+    if not href:
+        return None
+    parsed = urlparse.urlparse(href)
+    offset = urlparse.parse_qs(parsed.query).get("offset") or None
+    return offset and offset[0]
+
+
+class Paginator:
+    """Async iterator over the pages of a `linked_partitioning` endpoint.
+
+    The next page is already requested while the caller processes the current one.
+    Iteration stops after an empty page, when there is no `next_href`, or after the
+    first page for which `until` returns `True`.
+
+    Args:
+        endpoint: Route method returning a response with `collection` and `next_href`.
+        until: Optional predicate on a page, that page is the last one yielded.
+        step: Use numeric offsets increased by `step` instead of the `next_href` offset.
+        prefetch: Request the next page before yielding the current one.
+        **kwargs: Arguments passed to the endpoint on every request.
+    """
+
+    def __init__(
+        self,
+        endpoint: Callable[..., Awaitable[Any]],
+        until: Callable[[Any], bool] | None = None,
+        step: int | None = None,
+        prefetch: bool = True,
+        **kwargs,
+    ):
+        self.endpoint = endpoint
+        self.until = until
+        self.step = step
+        self.prefetch = prefetch
+        self.kwargs = kwargs
+        self.pages = 0
+        self.items = 0
+
+    def get_next_offset(self, response: Any, offset: Any) -> Any:
+        if not response.collection or not response.next_href:
+            return None
+        if self.step is not None:
+            return (offset or 0) + self.step
+        return get_next_offset(response.next_href)
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        kwargs = self.kwargs.copy()
+        offset = kwargs.pop("offset", None)
+        next_page: Any = self.endpoint(**kwargs, offset=offset)
+        try:
+            while next_page is not None:
+                response = await next_page
+                next_page = None
+                self.pages += 1
+                self.items += len(response.collection)
+                done = self.until is not None and self.until(response)
+                offset = None if done else self.get_next_offset(response, offset)
+                if offset is not None:
+                    next_page = self.endpoint(**kwargs, offset=offset)
+                    if self.prefetch:
+                        next_page = asyncio.ensure_future(next_page)
+                logger.info(f"Fetched page {self.pages} ({len(response.collection)} items, total = {self.items})")
+                yield response
+        finally:
+            if isinstance(next_page, asyncio.Future):
+                next_page.cancel()
+            elif next_page is not None:
+                next_page.close()
+
+    async def collect(self) -> list[Any]:
+        return [item async for response in self for item in response.collection]
@@ -0,0 +1,58 @@
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from datetime import datetime
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from soundcloud_tools.models.core import TrackCore
+from soundcloud_tools.models.track import Track, TrackSlim
+
+T = TypeVar("T")
+
+
+class Candidate(BaseModel):
+    """Slim view of a collected track with the fields needed until enrichment."""
+
+    id: int
+    duration: int | None = None
+    """Duration in milliseconds, unknown for slim tracks"""
+    created_at: datetime | None = None
+    playback_count: int | None = None
+    followers_count: int | None = None
+    surfaced: int = 1
+    """Number of times the track appeared in the sources"""
+
+    @property
+    def duration_s(self) -> int:
+        return (self.duration or 0) // 1000
+
+    @classmethod
+    def from_track(cls, track: Track | TrackCore | TrackSlim) -> "Candidate":
+        if isinstance(track, TrackSlim):
+            return cls(id=track.id)
+        return cls(
+            id=track.id,
+            duration=track.duration,
+            created_at=track.created_at,
+            playback_count=track.playback_count,
+            followers_count=None if track.user is None else track.user.followers_count,
+        )
+
+
+async def afilter(items: AsyncIterable[T], predicate: Callable[[T], bool | Awaitable[bool]]) -> AsyncIterator[T]:
+    """Yields the items for which the (sync or async) predicate is true, as they arrive."""
+    async for item in items:
+        result = predicate(item)
+        if result if isinstance(result, bool) else await result:
+            yield item
+
+
+async def merge_candidates(candidates: AsyncIterable[Candidate]) -> list[Candidate]:
+    """Returns the unique candidates in order of their first appearance, counting their appearances."""
+    merged: dict[int, Candidate] = {}
+    async for candidate in candidates:
+        if candidate.id in merged:
+            merged[candidate.id].surfaced += 1
+        else:
+            merged[candidate.id] = candidate
+    return list(merged.values())
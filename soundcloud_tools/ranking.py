@@ -0,0 +1,97 @@
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Literal
+
+import numpy as np
+from pydantic import BaseModel
+
+from soundcloud_tools.models.table import TrackTable
+from soundcloud_tools.models.track import Track
+from soundcloud_tools.utils import utcnow
+
+DAY = 24 * 60 * 60
+
+
+class Weights(BaseModel):
+    """Weights of the normalized ranking features, negative weights prefer low values."""
+
+    frequency: float = 0.0
+    """How often the track surfaced in the collected sources"""
+    plays: float = 0.0
+    likes_ratio: float = 0.0
+    """Likes per play"""
+    followers: float = 0.0
+    """Follower count of the uploader"""
+    recency: float = 0.0
+    duration: float = 0.0
+
+
+PRESETS: dict[str, Weights] = {
+    "playcount": Weights(plays=1),
+    "followers": Weights(followers=1),
+    "frequency": Weights(frequency=1, plays=0.1),
+    "balanced": Weights(frequency=1, plays=0.5, likes_ratio=0.5, followers=0.25, recency=0.5, duration=-0.25),
+}
+# Default preset per release type, matching the previous fixed orderings
+RELEASE_TYPE_PRESETS: dict[Literal["new", "old"] | None, str] = {
+    "new": "followers",
+    "old": "playcount",
+    None: "playcount",
+}
+
+
+def normalize(values: np.ndarray) -> np.ndarray:
+    """Scales values to [0, 1], constant columns become 0."""
+    if not len(values):
+        return values
+    low, high = values.min(), values.max()
+    return (values - low) / (high - low) if high > low else np.zeros_like(values)
+
+
+class CandidateTable:
+    """Scoring features of the tracks of a track table."""
+
+    def __init__(self, table: TrackTable, frequency: Mapping[int, int] | None = None):
+        frequency = frequency or {}
+        self.table = table
+        self.frequency = np.fromiter(
+            (frequency.get(i, 1) for i in table["id"].tolist()), dtype=np.float64, count=len(table)
+        )
+        self.plays = table["playback_count"].astype(np.float64)
+        self.likes = table["likes_count"].astype(np.float64)
+        self.followers = table["followers_count"].astype(np.float64)
+        self.created_at = table["created_at"].astype(np.int64) / 1e6
+        self.duration = table["duration"].astype(np.float64)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def get_features(self, now: datetime | None = None) -> dict[str, np.ndarray]:
+        now = now or utcnow()
+        age_days = np.maximum(now.timestamp() - self.created_at, 0) / DAY
+        return {
+            "frequency": normalize(np.log1p(self.frequency)),
+            "plays": normalize(np.log1p(self.plays)),
+            "likes_ratio": normalize(self.likes / (self.plays + 1)),
+            "followers": normalize(np.log1p(self.followers)),
+            "recency": normalize(np.exp(-age_days / 7)),
+            "duration": normalize(self.duration),
+        }
+
+    def score(self, weights: Weights, now: datetime | None = None) -> np.ndarray:
+        features = self.get_features(now=now)
+        scores = np.zeros(len(self))
+        for name, weight in weights.model_dump().items():
+            if weight:
+                scores += weight * features[name]
+        return scores
+
+    def rank(self, weights: Weights, now: datetime | None = None) -> TrackTable:
+        """Returns the table ordered by descending score, ties keep their order."""
+        return self.table.take(np.argsort(-self.score(weights, now=now), kind="stable"))
+
+
+def rank_tracks(tracks: list[Track], weights: Weights | str, frequency: Mapping[int, int] | None = None) -> list[Track]:
+    weights = PRESETS[weights] if isinstance(weights, str) else weights
+    table = TrackTable.from_items(tracks).dedup("id")
+    return CandidateTable(table, frequency=frequency).rank(weights).tracks  # type: ignore[return-value]
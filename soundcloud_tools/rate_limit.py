@@ -0,0 +1,102 @@
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def get_retry_after(response: httpx.Response) -> float | None:
+    """Returns the `Retry-After` header in seconds, supporting both delay and HTTP-date values."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(tz=timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """Token bucket whose refill rate adapts to the server's rate limiting.
+
+    Successful responses increase the rate additively up to `max_rate`, 429 responses
+    halve it and pause the bucket for the `Retry-After` delay (AIMD).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int | None = None,
+        min_rate: float = 0.5,
+        max_rate: float | None = None,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+    ):
+        self.rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate * 4
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        now = time.monotonic()
+        self._refill(now)
+        # Reserve a token right away, a negative balance is the queue of waiting requests
+        self.tokens -= 1
+        delay = max(-self.tokens / self.rate, self._paused_until - now, 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_rate_limited(self, retry_after: float | None = None):
+        self._refill(time.monotonic())
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        logger.warning(f"Rate limited, reducing request rate to {self.rate:.2f}/s")
+
+
+class RetryPolicy:
+    """Retries transient failures with jittered exponential backoff."""
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, method: str, response: httpx.Response) -> bool:
+        if response.status_code == 429:
+            return True
+        # Server errors are only retried for idempotent requests, a failed POST may have been applied
+        return method.upper() in {"GET", "HEAD", "PUT", "DELETE"} and response.status_code in RETRY_STATUS_CODES
+
+    def should_retry_error(self, method: str, error: httpx.TransportError) -> bool:
+        # Connection failures never reached the server and are safe to retry for any method
+        return isinstance(error, httpx.ConnectError | httpx.ConnectTimeout) or method.upper() in {"GET", "HEAD"}
+
+    def get_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
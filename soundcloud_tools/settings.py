@@ -1,10 +1,11 @@
 from functools import lru_cache
+from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_nested_delimiter="__", env_file=".env")
+    model_config = SettingsConfigDict(env_nested_delimiter="__", env_file=".env", env_ignore_empty=True)
 
     base_url: str = "https://api-v2.soundcloud.com"
     oauth_token: str
@@ -14,11 +15,21 @@ class Settings(BaseSettings):
     sc_a_id: str = ""
 
     proxy: str | None = None
+    http2: bool = False  # Requires the `h2` package (`pip install httpx[http2]`)
+    max_connections_per_host: int = 8
+    rate_limit: float = 10.0  # Initial requests per second, adapted on 429 responses
+    max_retries: int = 5
 
     root_music_folder: str = "~/Music/tracks"
+    data_dir: str = "~/.soundcloud-tools"
+    cache_max_size_mb: int = 256
 
     version: str = "1.0"
 
+    @property
+    def data_path(self) -> Path:
+        return Path(self.data_dir).expanduser()
+
 
 @lru_cache(maxsize=1)
 def get_settings():
@@ -0,0 +1,80 @@
+import gzip
+import logging
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+from soundcloud_tools.models.track import Track
+from soundcloud_tools.pipeline import Candidate
+from soundcloud_tools.settings import get_settings
+from soundcloud_tools.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class Surfacing(BaseModel):
+    type: str
+    """Type of the collection item the track appeared in, e.g. `track-repost` or `comment`"""
+    at: datetime
+
+
+class SnapshotTrack(BaseModel):
+    track: Track
+    surfaced: list[Surfacing]
+
+
+class WeeklySnapshot(BaseModel):
+    """Collected and enriched candidates of a week, any half or release type playlist can be derived from it."""
+
+    user_id: int
+    start: datetime
+    end: datetime
+    collected_at: datetime = Field(default_factory=utcnow)
+    types: list[str]
+    tracks: list[SnapshotTrack]
+    seen_track_ids: set[int]
+    liked_track_ids: set[int] | None = None
+    """Only collected if liked tracks should be excluded"""
+
+    @staticmethod
+    def get_path(user_id: int, start: datetime, end: datetime) -> Path:
+        return get_settings().data_path / "snapshots" / f"weekly-{user_id}-{start.date()}-{end.date()}.json.gz"
+
+    @property
+    def path(self) -> Path:
+        return self.get_path(self.user_id, self.start, self.end)
+
+    @classmethod
+    def load(cls, user_id: int, start: datetime, end: datetime) -> "WeeklySnapshot | None":
+        path = cls.get_path(user_id, start, end)
+        if not path.exists():
+            return None
+        snapshot = cls.model_validate_json(gzip.decompress(path.read_bytes()))
+        logger.info(f"Loaded snapshot with {len(snapshot.tracks)} tracks from {path}")
+        return snapshot
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(gzip.compress(self.model_dump_json(exclude_defaults=True).encode()))
+        logger.info(f"Saved snapshot with {len(self.tracks)} tracks to {self.path}")
+
+    def get_tracks_by_id(self, track_ids: list[int]) -> list[Track]:
+        tracks = {t.track.id: t.track for t in self.tracks}
+        return [tracks[track_id] for track_id in track_ids if track_id in tracks]
+
+    async def iter_candidates(self, start: datetime, end: datetime, types: Sequence[str]) -> AsyncIterator[Candidate]:
+        for track in self.get_tracks(start=start, end=end, types=types):
+            yield Candidate.from_track(track)
+
+    def get_tracks(self, start: datetime, end: datetime, types: Sequence[str]) -> list[Track]:
+        """Returns a track for each time it surfaced between `start` and `end` in one of `types`."""
+        if end > self.collected_at:
+            logger.info(f"Snapshot was collected at {self.collected_at}, later items are not included")
+        return [
+            t.track
+            for t in self.tracks
+            for surfacing in t.surfaced
+            if surfacing.type in types and start < surfacing.at < end
+        ]
@@ -0,0 +1,354 @@
+"""Local SQLite store of the entities and collection edges seen in API responses.
+
+Tracks, users and playlists are upserted from every response the client validates,
+keeping the last non-null value of each column so that slim projections never erase
+data of full models. Collection items become edges between a user and a track,
+playlist or user (likes, reposts, posts, followings) with their timestamp. Edges are
+only added, a removed like stays in the store.
+
+The store is opt-in (`--store`), the getters answer indexed queries on the collected
+data, e.g. `get_following_reposts` for the tracks reposted by a user's followings.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+from soundcloud_tools.models.artist_shortcut import ArtistShortcut, ArtistShortcutStories
+from soundcloud_tools.models.core import LikeCore, PlaylistCore, TrackCore, UserCore
+from soundcloud_tools.models.like import BaseLike
+from soundcloud_tools.models.playlist import Playlist
+from soundcloud_tools.models.track import Track
+from soundcloud_tools.models.user import User
+from soundcloud_tools.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+EdgeKind = Literal["like", "repost", "post", "following"]
+TargetType = Literal["track", "playlist", "user"]
+
+# Edge of a stream, repost or story item by its type
+ITEM_EDGES: dict[str, tuple[EdgeKind, TargetType]] = {
+    "track": ("post", "track"),
+    "track-post": ("post", "track"),
+    "track-repost": ("repost", "track"),
+    "playlist": ("post", "playlist"),
+    "playlist-post": ("post", "playlist"),
+    "playlist-repost": ("repost", "playlist"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT,
+    followers_count INTEGER,
+    data TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    title TEXT,
+    genre TEXT,
+    duration INTEGER,
+    created_at REAL,
+    playback_count INTEGER,
+    likes_count INTEGER,
+    data TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_user_id ON tracks (user_id);
+CREATE TABLE IF NOT EXISTS playlists (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    title TEXT,
+    created_at REAL,
+    data TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    playlist_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    track_id INTEGER NOT NULL,
+    PRIMARY KEY (playlist_id, position)
+);
+CREATE INDEX IF NOT EXISTS playlist_tracks_track_id ON playlist_tracks (track_id);
+CREATE TABLE IF NOT EXISTS edges (
+    user_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    target_type TEXT NOT NULL,
+    target_id INTEGER NOT NULL,
+    created_at REAL,
+    PRIMARY KEY (user_id, kind, target_type, target_id)
+);
+CREATE INDEX IF NOT EXISTS edges_kind_created_at ON edges (kind, target_type, created_at);
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target_type, target_id);
+"""
+COLUMNS = {
+    "users": ["id", "username", "followers_count", "data", "updated_at"],
+    "tracks": [
+        "id",
+        "user_id",
+        "title",
+        "genre",
+        "duration",
+        "created_at",
+        "playback_count",
+        "likes_count",
+        "data",
+        "updated_at",
+    ],
+    "playlists": ["id", "user_id", "title", "created_at", "data", "updated_at"],
+}
+
+
+class Edge(BaseModel):
+    user_id: int
+    kind: EdgeKind
+    target_type: TargetType
+    target_id: int
+    created_at: datetime | None = None
+
+
+def get_upsert(table: str) -> str:
+    columns = COLUMNS[table]
+    updates = ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in columns[1:])
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT (id) DO UPDATE SET {updates}"
+    )
+
+
+def to_timestamp(value: datetime | None) -> float | None:
+    return None if value is None else value.timestamp()
+
+
+def from_timestamp(value: float | None) -> datetime | None:
+    return None if value is None else datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def get_urn_id(urn: str) -> int:
+    return int(urn.rsplit(":", 1)[-1])
+
+
+class StoreBatch:
+    """Rows collected from one response, written in a single transaction."""
+
+    def __init__(self):
+        self.now = time.time()
+        self.users: dict[int, tuple] = {}
+        self.tracks: dict[int, tuple] = {}
+        self.playlists: dict[int, tuple] = {}
+        self.playlist_tracks: dict[int, list[int]] = {}
+        self.edges: list[tuple] = []
+
+    def add_user(self, user: User | UserCore):
+        data = user.model_dump_json() if isinstance(user, User) else None
+        self.users[user.id] = (user.id, user.username, user.followers_count, data, self.now)
+
+    def add_track(self, track: Track | TrackCore):
+        if track.user:
+            self.add_user(track.user)
+        data = track.model_dump_json() if isinstance(track, Track) else None
+        self.tracks[track.id] = (
+            track.id,
+            track.user and track.user.id,
+            track.title,
+            track.genre,
+            track.duration,
+            to_timestamp(track.created_at),
+            track.playback_count,
+            track.likes_count,
+            data,
+            self.now,
+        )
+
+    def add_playlist(self, playlist: Playlist | PlaylistCore):
+        user_id = None
+        if isinstance(playlist, Playlist):
+            self.add_user(playlist.user)
+            user_id = playlist.user_id
+        data = playlist.model_dump_json(exclude={"tracks"}) if isinstance(playlist, Playlist) else None
+        created_at = to_timestamp(getattr(playlist, "created_at", None))
+        self.playlists[playlist.id] = (playlist.id, user_id, playlist.title, created_at, data, self.now)
+        # Playlists without loaded tracks keep their stored tracks
+        if playlist.tracks:
+            for track in playlist.tracks:
+                if isinstance(track, Track | TrackCore):
+                    self.add_track(track)
+            self.playlist_tracks[playlist.id] = [track.id for track in playlist.tracks]
+
+    def add_edge(self, user_id: int | None, kind: EdgeKind, target_type: TargetType, target_id: int, at=None):
+        if user_id is not None:
+            self.edges.append((user_id, kind, target_type, target_id, to_timestamp(at)))
+
+    def add_item(self, item: Any, owner_id: int | None):
+        """Adds the entities of a collection item and the edge it represents."""
+        track = getattr(item, "track", None) or getattr(item, "snippeted_track", None)
+        playlist = getattr(item, "playlist", None)
+        if isinstance(user := getattr(item, "user", None), User | UserCore):
+            self.add_user(user)
+            owner_id = user.id
+        if isinstance(playlist, Playlist | PlaylistCore):
+            self.add_playlist(playlist)
+        if isinstance(track, Track | TrackCore):
+            self.add_track(track)
+        kind: EdgeKind
+        target_type: TargetType
+        if isinstance(item, BaseLike | LikeCore):
+            kind, target_type = "like", "playlist" if playlist else "track"
+        elif (edge := ITEM_EDGES.get(getattr(item, "type", None) or "")) is not None:
+            kind, target_type = edge
+        else:
+            return
+        target = playlist if target_type == "playlist" else track
+        if target is not None:
+            self.add_edge(owner_id, kind, target_type, target.id, item.created_at)
+
+    def add(self, item: Any, owner_id: int | None):
+        if isinstance(item, int):
+            self.add_edge(owner_id, "following", "user", item)
+        elif isinstance(item, Track | TrackCore):
+            self.add_track(item)
+        elif isinstance(item, User | UserCore):
+            self.add_user(item)
+        elif isinstance(item, Playlist | PlaylistCore):
+            self.add_playlist(item)
+        elif isinstance(item, ArtistShortcut):
+            self.add_user(item.user)
+        else:
+            self.add_item(item, owner_id)
+
+
+def get_items(response: Any, user_id: int | None) -> tuple[Iterable[Any], int | None]:
+    """Returns the items of a response and the user they belong to."""
+    if isinstance(response, ArtistShortcutStories):
+        return response.stories, get_urn_id(response.artist_urn)
+    if isinstance(response, list):
+        return response, user_id
+    if isinstance(collection := getattr(response, "collection", None), list):
+        return collection, user_id
+    return [response], user_id
+
+
+class EntityStore:
+    """Indexed local copy of the users, tracks, playlists and collection edges."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Responses are written from worker threads, the lock serializes all use of the shared connection
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    def add_response(self, response: Any, user_id: int | None = None):
+        """Stores the entities and edges of a validated response, `user_id` owns path scoped collections."""
+        if not isinstance(response, BaseModel | list):
+            return
+        items, owner_id = get_items(response, user_id)
+        batch = StoreBatch()
+        for item in items:
+            batch.add(item, owner_id)
+        self.write(batch)
+
+    def write(self, batch: StoreBatch):
+        with self.lock, self.db:
+            self.db.executemany(get_upsert("users"), batch.users.values())
+            self.db.executemany(get_upsert("tracks"), batch.tracks.values())
+            self.db.executemany(get_upsert("playlists"), batch.playlists.values())
+            for playlist_id, track_ids in batch.playlist_tracks.items():
+                self.db.execute("DELETE FROM playlist_tracks WHERE playlist_id = ?", (playlist_id,))
+                self.db.executemany(
+                    "INSERT INTO playlist_tracks VALUES (?, ?, ?)",
+                    [(playlist_id, position, track_id) for position, track_id in enumerate(track_ids)],
+                )
+            self.db.executemany(
+                "INSERT INTO edges VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET created_at = COALESCE(excluded.created_at, created_at)",
+                batch.edges,
+            )
+        logger.debug(f"Stored {len(batch.tracks)} tracks, {len(batch.users)} users and {len(batch.edges)} edges")
+
+    def get_tracks(self, track_ids: Iterable[int]) -> list[Track]:
+        """Returns the stored full tracks in the given order, skipping unknown and slim-only tracks."""
+        track_ids = list(track_ids)
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT id, data FROM tracks WHERE data IS NOT NULL AND id IN ({', '.join('?' * len(track_ids))})",
+                track_ids,
+            ).fetchall()
+        tracks = {track_id: Track.model_validate_json(data) for track_id, data in rows}
+        return [tracks[i] for i in track_ids if i in tracks]
+
+    def get_user(self, user_id: int) -> User | None:
+        with self.lock:
+            row = self.db.execute("SELECT data FROM users WHERE id = ? AND data IS NOT NULL", (user_id,)).fetchone()
+        return None if row is None else User.model_validate_json(row[0])
+
+    def get_playlist_track_ids(self, playlist_id: int) -> list[int]:
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT track_id FROM playlist_tracks WHERE playlist_id = ? ORDER BY position", (playlist_id,)
+            ).fetchall()
+        return [track_id for (track_id,) in rows]
+
+    def get_edges(
+        self,
+        kind: EdgeKind,
+        user_ids: Iterable[int] | None = None,
+        target_type: TargetType = "track",
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[Edge]:
+        """Returns the edges of a kind, newest first, optionally by users and within [start, end)."""
+        query = "SELECT * FROM edges WHERE kind = ? AND target_type = ?"
+        params: list[Any] = [kind, target_type]
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            query += f" AND user_id IN ({', '.join('?' * len(user_ids))})"
+            params.extend(user_ids)
+        if start:
+            query += " AND created_at >= ?"
+            params.append(start.timestamp())
+        if end:
+            query += " AND created_at < ?"
+            params.append(end.timestamp())
+        with self.lock:
+            rows = self.db.execute(query + " ORDER BY created_at DESC", params).fetchall()
+        return [
+            Edge(user_id=u, kind=k, target_type=t, target_id=i, created_at=from_timestamp(at))
+            for u, k, t, i, at in rows
+        ]
+
+    def get_following_ids(self, user_id: int) -> list[int]:
+        return [edge.target_id for edge in self.get_edges("following", user_ids=[user_id], target_type="user")]
+
+    def get_following_reposts(self, user_id: int, start: datetime, end: datetime) -> list[Edge]:
+        """Track reposts by the followings of `user_id` within [start, end), newest first."""
+        with self.lock:
+            rows = self.db.execute(
+                """
+                SELECT r.user_id, r.target_id, r.created_at FROM edges AS f
+                JOIN edges AS r ON r.user_id = f.target_id AND r.kind = 'repost' AND r.target_type = 'track'
+                WHERE f.user_id = ? AND f.kind = 'following' AND f.target_type = 'user'
+                AND r.created_at >= ? AND r.created_at < ?
+                ORDER BY r.created_at DESC
+                """,
+                (user_id, start.timestamp(), end.timestamp()),
+            ).fetchall()
+        return [
+            Edge(user_id=u, kind="repost", target_type="track", target_id=i, created_at=from_timestamp(at))
+            for u, i, at in rows
+        ]
+
+
+def get_entity_store() -> EntityStore:
+    return EntityStore(path=get_settings().data_path / "entities.sqlite")
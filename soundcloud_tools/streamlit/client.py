@@ -1,12 +1,14 @@
 import streamlit as st
 
+from soundcloud_tools.cache import get_response_cache
 from soundcloud_tools.client import Client
 
 
 class StreamlitClient(Client):
-    @st.cache_data
-    def _make_request(self, *arg, **kwargs):
-        return self.make_request(*arg, **kwargs)
+    def __init__(self, **kwargs):
+        # Persist responses across reruns and sessions instead of the per-process `st.cache_data`
+        kwargs.setdefault("cache", get_response_cache())
+        super().__init__(**kwargs)
 
 
 @st.cache_resource
@@ -1,5 +1,3 @@
-import asyncio
-
 import streamlit as st
 from streamlit import session_state as sst
 
@@ -362,7 +360,7 @@ def comment_editor(track_info: TrackInfo, sc_track_info: TrackInfo | None) -> Co
     caption_col.write(f"__Comment__ {changed_string(old_comment, comment)}")
 
     track_id = Comment.from_str(comment).soundcloud_id
-    if track_id and (track := asyncio.run(get_client().get_track(track_id=track_id))):
+    if track_id and (track := get_client().run(get_client().get_track(track_id=track_id))):
         with field_cols[1]:
             render_embedded_track(track, height=100)
     next(buttons).button(
@@ -1,7 +1,6 @@
-import asyncio
 import base64
 import logging
-import re
+from collections.abc import Iterable
 from datetime import date
 from typing import Callable
 
@@ -10,13 +9,16 @@ import requests
 import streamlit as st
 from streamlit import session_state as sst
 
+from soundcloud_tools.archive import diff_tables, get_archive_path, load_archive, write_archive
 from soundcloud_tools.models import User
 from soundcloud_tools.models.playlist import Playlist, PlaylistCreate, PlaylistUpdateImageRequest
 from soundcloud_tools.models.repost import Repost
 from soundcloud_tools.models.request import PlaylistCreateRequest
+from soundcloud_tools.models.table import TrackTable
 from soundcloud_tools.models.track import Track
+from soundcloud_tools.pagination import Paginator
 from soundcloud_tools.settings import get_settings
-from soundcloud_tools.streamlit.client import Client, get_client
+from soundcloud_tools.streamlit.client import get_client
 from soundcloud_tools.streamlit.utils import display_collection_tracks
 
 logger = logging.getLogger(__name__)
@@ -25,27 +27,34 @@ logger = logging.getLogger(__name__)
 @st.cache_data
 def search_users(user_query: str) -> list[User]:
     client = get_client()
-    result = asyncio.run(client.search(q=user_query))
+    result = client.run(client.search(q=user_query))
     return [user for user in result.collection if user.kind == "user"]
 
 
 @st.cache_data(show_spinner="Fetching tracks", hash_funcs={"builtins.method": str})
 def fetch_collection_response(endpoint: Callable, limit: int = 100, **kwargs) -> list[Repost] | list[Track]:
-    offset: int | None = 0
-    items = []
-    while True:
-        try:
-            response = asyncio.run(endpoint(**kwargs, limit=limit, offset=offset))
-            items.extend(response.collection)
-            if not response.next_href:
-                break
-            offset = Client.get_next_offset(response.next_href)
-            logger.info("Using next offset", offset)
-        except Exception as e:
-            logger.error(e)
-            raise e
-
-    return items
+    return get_client().run(Paginator(endpoint, limit=limit, **kwargs).collect())
+
+
+def load_collection(name: str, user_id: int) -> TrackTable | None:
+    archive = load_archive(get_archive_path(name, user_id))
+    return None if archive is None else archive.table
+
+
+def collect_collection(name: str, user_id: int, endpoint: Callable) -> TrackTable:
+    """Fetches and archives a collection, reporting the changes since the previous archive."""
+    path = get_archive_path(name, user_id)
+    previous = load_archive(path)
+    items = fetch_collection_response(endpoint=endpoint, user_id=user_id, limit=200)
+    table = TrackTable.from_items(items)
+    if previous:
+        diff = diff_tables(previous.table, table)
+        st.toast(
+            f"{name.title()}: {len(diff.added)} added and {len(diff.removed)} removed "
+            f"since {previous.header.created_at:%Y-%m-%d %H:%M}"
+        )
+    write_archive(path, items)
+    return table
 
 
 def get_type(repost):
@@ -82,13 +91,10 @@ def display_user(user: User):
         )
 
 
-def create_playlist(likes: list[Track], reposts: list[Repost], artist: str, filters: dict) -> Playlist:
+def create_playlist(likes: TrackTable, reposts: TrackTable, artist: str, filters: dict) -> Playlist:
     # Keep liked/reposted order
-    items = sorted(likes + reposts, key=lambda x: x.created_at, reverse=True)
-    track_ids = []
-    for item in items:
-        if item.track.id not in track_ids:
-            track_ids.append(item.track.id)
+    items = TrackTable.concat([likes, reposts]).sort("added_at", descending=True).dedup("id")
+    track_ids = items["id"].tolist()
 
     playlist = PlaylistCreateRequest(
         playlist=PlaylistCreate(
@@ -101,7 +107,7 @@ def create_playlist(likes: list[Track], reposts: list[Repost], artist: str, filt
     )
     request = devtools.pformat(playlist.model_dump(exclude={"playlist": {"tracks"}}))
     logger.info(f"Creating playlist {request} with {len(track_ids)} tracks")
-    created_playlist = asyncio.run(get_client().post_playlist(data=playlist))
+    created_playlist = get_client().run(get_client().post_playlist(data=playlist))
     st.toast(f"Playlist created for {artist} with {len(track_ids)} tracks.", icon="🎉")
     return created_playlist
 
@@ -114,9 +120,11 @@ def main():
     st.divider()
 
     client = get_client()
-    sst.setdefault("user_likes", [])
-    sst.setdefault("user_reposts", [])
-    sst.setdefault("own_likes", [])
+    sst.setdefault("user_likes", TrackTable.from_items([]))
+    sst.setdefault("user_reposts", TrackTable.from_items([]))
+    if "own_likes" not in sst:
+        own_likes = load_collection("likes", get_settings().user_id)
+        sst.own_likes = TrackTable.from_items([]) if own_likes is None else own_likes
     sst.setdefault("fetched_user", {})
 
     with st.sidebar:
@@ -137,12 +145,16 @@ def main():
             "This may take a while."
         )
     if collect:
-        sst.user_likes = fetch_collection_response(endpoint=client.get_user_likes, user_id=user.id, limit=200)
-        sst.user_reposts = fetch_collection_response(endpoint=client.get_user_reposts, user_id=user.id, limit=200)
-        sst.own_likes = fetch_collection_response(
-            endpoint=client.get_user_likes, user_id=get_settings().user_id, limit=200
-        )
+        sst.user_likes = collect_collection("likes", user.id, endpoint=client.get_user_likes)
+        sst.user_reposts = collect_collection("reposts", user.id, endpoint=client.get_user_reposts)
+        sst.own_likes = collect_collection("likes", get_settings().user_id, endpoint=client.get_user_likes)
         sst.fetched_user[user.id] = True
+    elif not sst.fetched_user.get(user.id):
+        # Collections archived by a previous session load without fetching
+        likes, reposts = load_collection("likes", user.id), load_collection("reposts", user.id)
+        if likes is not None and reposts is not None:
+            sst.user_likes, sst.user_reposts = likes, reposts
+            sst.fetched_user[user.id] = True
 
     if not sst.fetched_user.get(user.id):
         st.warning("No likes or reposts fetched yet for this user.")
@@ -175,7 +187,7 @@ def update_playlist_image(user: User, playlist_id: int):
     data = requests.get(user.hq_avatar_url).content
     image_data = base64.b64encode(data).decode("utf-8")
     playlist_urn = f"soundcloud:playlists:{playlist_id}"
-    asyncio.run(
+    get_client().run(
         get_client().update_playlist_image(
             playlist_urn=playlist_urn, data=PlaylistUpdateImageRequest(image_data=image_data)
         )
@@ -190,7 +202,7 @@ def get_filters():
     end_date = c3.date_input("End Date", value=None) or date.today()
     max_length = c4.number_input("Max Length (mins)", value=12, step=1)
     exclude_own = c5.checkbox("Exclude Own Liked Tracks", value=True)
-    own_likes = [like.track.id for like in sst.own_likes if hasattr(like, "track")] if exclude_own else []
+    own_likes = sst.own_likes["id"] if exclude_own else []
     c5.write(f"Own Likes: {len(own_likes)}")
 
     filters = {
@@ -205,29 +217,21 @@ def get_filters():
 
 
 def filter_collection(
-    collection: list[Track] | list[Repost],
+    collection: TrackTable,
     start_date: date,
     end_date: date,
     max_length: int,
-    own_likes: list[int],
+    own_likes: Iterable[int],
     search: str,
-):
-    items = [
-        item
-        for item in collection
-        if hasattr(item, "track")
-        and start_date <= item.created_at.date() <= end_date
-        and item.track.duration / 60_000 < max_length
-        and (not own_likes or (own_likes and item.track.id not in own_likes))
-        and (
-            not search
-            or (
-                search
-                and any(re.search(search, attr, flags=re.IGNORECASE) for attr in (item.track.title, item.track.artist))
-            )
-        )
-    ]
-    return sorted(items, key=lambda x: x.created_at, reverse=True)
+) -> TrackTable:
+    mask = (
+        collection.between("added_at", start_date, end_date)
+        & (collection["duration"] / 60_000 < max_length)
+        & ~collection.isin("id", own_likes)
+    )
+    if search:
+        mask &= collection.matches(search, columns=("title", "artist"))
+    return collection.filter(mask).sort("added_at", descending=True)
 
 
 if __name__ == "__main__":
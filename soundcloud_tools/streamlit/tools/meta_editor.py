@@ -1,4 +1,3 @@
-import asyncio
 import logging
 from copy import copy
 from pathlib import Path
@@ -126,15 +125,15 @@ def render_soundcloud_search(query: str) -> TrackInfo | None:
     st.divider()
     track_ph = st.container(border=True)
     if track_url := url_ph.text_input("Url", key="ti_search_url"):
-        if not (track_id := asyncio.run(get_client().get_track_id(url=track_url))):
+        if not (track_id := get_client().run(get_client().get_track_id(url=track_url))):
             st.error("Could not find track id from url")
             return None
-        if not (track := asyncio.run(get_client().get_track(track_id=track_id))):
+        if not (track := get_client().run(get_client().get_track(track_id=track_id))):
             st.error("Track with id=`{track_id}` not found")
             return None
     else:
         sst.setdefault("search_result", {})
-        sst.search_result[query] = asyncio.run(get_client().search(q=query))
+        sst.search_result[query] = get_client().run(get_client().search(q=query))
         if not (result := sst.search_result.get(query)):
             return None
 
@@ -324,7 +323,7 @@ def render_track_info(track_info: TrackInfo, title_col, comment_col, artwork_col
             if (
                 track_info.comment
                 and track_info.comment.soundcloud_id
-                and (track := asyncio.run(get_client().get_track(track_id=track_info.comment.soundcloud_id)))
+                and (track := get_client().run(get_client().get_track(track_id=track_info.comment.soundcloud_id)))
             ):
                 render_embedded_track(track, height=100)
         else:
@@ -2,14 +2,15 @@ import urllib.parse
 from collections import Counter
 from typing import Callable
 
-import pandas as pd
 import streamlit as st
 from streamlit import session_state as sst
 from tabulate import tabulate
 
 from soundcloud_tools.models import Track
+from soundcloud_tools.models.core import TrackCore
 from soundcloud_tools.models.repost import Repost
 from soundcloud_tools.models.stream import StreamItem
+from soundcloud_tools.models.table import TrackTable
 
 
 def apply_to_sst(func: Callable, key: str) -> Callable:
@@ -35,7 +36,7 @@ def generate_css(**kwargs):
     return ";".join(f"{k.replace('_', '-')}:{v}" for k, v in kwargs.items())
 
 
-def render_embedded_track(track: Track, height: int = 300):
+def render_embedded_track(track: Track | TrackCore, height: int = 300):
     options = {
         "url": f"https://api.soundcloud.com/tracks/{track.id}",
         "color": "#ff5500",
@@ -64,14 +65,21 @@ def render_embedded_track(track: Track, height: int = 300):
         text_decoration="none",
     )
 
+    if isinstance(track, Track):
+        footer = f"""\
+<a href="{track.user.permalink_url}" title="{track.user.full_name}" target="_blank" style="{link_css}">\
+{track.user.full_name}</a>
+ ·
+<a href="{track.permalink_url}" title="{track.title}" target="_blank" style="{link_css}">{track.title}</a>"""
+    else:
+        # Core projections of archived collections have no links
+        footer = f"{'' if track.user is None else track.user.username} · {track.title or ''}"
+
     st.write(
         f"""\
 <iframe width="100%" height="{height}" scrolling="no" frameborder="no" allow="autoplay" src="{src_url}"></iframe>
 <div style="{div_css}">
-<a href="{track.user.permalink_url}" title="{track.user.full_name}" target="_blank" style="{link_css}">\
-{track.user.full_name}</a>
- ·
-<a href="{track.permalink_url}" title="{track.title}" target="_blank" style="{link_css}">{track.title}</a>
+{footer}
 </div>""",
         unsafe_allow_html=True,
     )
@@ -97,32 +105,27 @@ def wrap_and_reset_state(func: Callable):
     return wrapper
 
 
-def display_collection_tracks(collection: list[StreamItem] | list[Track] | list[Repost], caption: str):
-    data = pd.DataFrame(
-        [
-            getattr(item, "track", item).model_dump() | {"liked_at": getattr(item, "created_at", None)}
-            for item in collection
-        ]
-    )
-    if data.empty:
+def display_collection_tracks(collection: TrackTable | list[StreamItem] | list[Track] | list[Repost], caption: str):
+    table = collection if isinstance(collection, TrackTable) else TrackTable.from_items(collection)
+    if not len(table):
         st.warning(f"No {caption} found.")
         return
+    data = table.to_pandas()
     cols = data.columns.to_list()
     cols.remove("title")
-    cols.remove("liked_at")
-    data = data[["title", "liked_at", *cols]]
+    cols.remove("added_at")
+    data = data[["title", "added_at", *cols]]
 
     c1, c2 = st.columns([1, 1])
     selection = c1.dataframe(
         data, use_container_width=True, on_select="rerun", selection_mode="single-row", key=f"df_{caption}"
     )
-    st.caption(f"Total {caption}: {len(collection)}")
+    st.caption(f"Total {caption}: {len(table)}")
     with c2.popover("Info", use_container_width=True):
-        genres = sorted(Counter(data["genre"]).items(), key=lambda x: x[1], reverse=True)
+        genres = Counter(table["genre"]).most_common()
         st.table(genres)
 
     if index := selection["selection"]["rows"]:
-        selected = data.iloc[index[0]]
-        track = Track(**selected.to_dict())
+        track = table.track_at(index[0])
         with c2:
             render_embedded_track(track)
@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from soundcloud_tools.client import Client
+from soundcloud_tools.models.core import StreamCore, StreamItemCore
+from soundcloud_tools.settings import get_settings
+from soundcloud_tools.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+STREAM_PAGE_SIZE = 200
+
+
+def is_before(response: StreamCore, start: datetime) -> bool:
+    """Whether a stream page lies completely before `start`, the stream is ordered newest first."""
+    return all(item.created_at < start for item in response.collection)
+
+
+class StreamSyncState(BaseModel):
+    covered_since: datetime | None = None
+    """All stream items created after this point are stored in `items`"""
+    items: list[StreamItemCore] = []
+    """Stream items, newest first"""
+
+
+class StreamSync:
+    """Persisted copy of a user's stream, so later runs only fetch the new items.
+
+    A sync pages from the top of the stream until it reaches the newest stored item
+    (the watermark). If the requested window starts before the stored coverage, the
+    whole window is fetched again from the top, so the pages stay contiguous even if
+    items were removed from the stream since the last sync.
+    """
+
+    def __init__(self, user_id: int, path: Path | None = None, retention: timedelta = timedelta(weeks=3)):
+        self.user_id = user_id
+        self.path = path or get_settings().data_path / "sync" / f"stream-{user_id}.json"
+        self.retention = retention
+        self.state = (
+            StreamSyncState.model_validate_json(self.path.read_text()) if self.path.exists() else StreamSyncState()
+        )
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(self.state.model_dump_json())
+
+    def is_covered(self, start: datetime) -> bool:
+        return self.state.covered_since is not None and self.state.covered_since <= start
+
+    async def fetch_pages(self, client: Client, start: datetime, known: set[str]) -> tuple[list[StreamItemCore], bool]:
+        """Pages the stream from the top until a page is before `start` or contains a known item.
+
+        Returns:
+            The new items and whether a known item was reached.
+        """
+        items: list[StreamItemCore] = []
+        reached_known = False
+        pages = client.paginate(
+            client.get_stream,
+            until=lambda response: is_before(response, start) or any(c.uuid in known for c in response.collection),
+            step=STREAM_PAGE_SIZE,
+            user_urn=f"soundcloud:users:{self.user_id}",
+            limit=STREAM_PAGE_SIZE,
+            offset=0,
+            projection="core",
+        )
+        async for response in pages:
+            new_items = [c for c in response.collection if c.uuid not in known]
+            reached_known = reached_known or len(new_items) < len(response.collection)
+            items += new_items
+        return items, reached_known
+
+    async def sync(self, client: Client, start: datetime) -> list[StreamItemCore]:
+        """Brings the stored stream up to date and back to `start`, returns all items since `start`."""
+        if self.is_covered(start):
+            delta, connected = await self.fetch_pages(client, start=start, known={c.uuid for c in self.state.items})
+            logger.info(f"Fetched {len(delta)} new stream items ({connected = })")
+        else:
+            # Refetch the whole window, continuing after the stored items would skip items if some were removed
+            delta, connected = await self.fetch_pages(client, start=start, known=set())
+            logger.info(f"Fetched {len(delta)} stream items back to {start}")
+
+        if connected:
+            items, covered_since = delta + self.state.items, self.state.covered_since
+        else:
+            # The fetched items reach back to `start` without the stored ones, these are outdated
+            items, covered_since = delta, start
+
+        items = sorted({c.uuid: c for c in items}.values(), key=lambda c: c.created_at, reverse=True)
+        cutoff = utcnow() - self.retention
+        self.state = StreamSyncState(
+            covered_since=max(covered_since or cutoff, cutoff),
+            items=[c for c in items if c.created_at >= cutoff],
+        )
+        self.save()
+        return [c for c in items if c.created_at >= start]
@@ -1,4 +1,7 @@
 import inspect
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
 from enum import IntEnum
 from math import ceil
@@ -20,8 +23,25 @@ class Weekday(IntEnum):
     SUNDAY = 6
 
 
+_frozen_now: ContextVar[datetime | None] = ContextVar("frozen_now", default=None)
+
+
+def utcnow() -> datetime:
+    return _frozen_now.get() or datetime.now(tz=timezone.utc)
+
+
+@contextmanager
+def frozen_time(now: datetime) -> Iterator[None]:
+    """Pins `utcnow` to `now`, e.g. to replay a recorded run against its original weeks."""
+    token = _frozen_now.set(now)
+    try:
+        yield
+    finally:
+        _frozen_now.reset(token)
+
+
 def get_scheduled_time(day: Weekday = Weekday.SUNDAY, weeks: int = 0):
-    now = datetime.now(tz=timezone.utc)
+    now = utcnow()
     days_until = (day - now.weekday()) % 7
     last_day = now + timedelta(days=days_until, weeks=weeks)
     return last_day.replace(hour=8, minute=0, second=0, microsecond=0)
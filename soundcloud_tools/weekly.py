@@ -1,114 +1,171 @@
+import asyncio
 import logging
-from collections import Counter
+from collections import defaultdict
+from collections.abc import AsyncIterator, Collection, Container, Mapping
 from datetime import datetime, timezone
 from typing import Literal
 
 import devtools
 
+from soundcloud_tools.checkpoint import Checkpoints, run_stage
 from soundcloud_tools.client import Client
+from soundcloud_tools.index import LikedTrackIndex, SeenTrackIndex
 from soundcloud_tools.models.artist_shortcut import Story, StoryType
 from soundcloud_tools.models.comment import Comment
+from soundcloud_tools.models.core import StreamItemCore, TrackCore
 from soundcloud_tools.models.playlist import PlaylistCreate
 from soundcloud_tools.models.request import PlaylistCreateRequest
-from soundcloud_tools.models.stream import Stream, StreamItem, StreamItemType
-from soundcloud_tools.models.track import Track
+from soundcloud_tools.models.stream import StreamItemType
+from soundcloud_tools.models.track import Track, TrackSlim
+from soundcloud_tools.models.user import User
+from soundcloud_tools.pipeline import Candidate, afilter, merge_candidates
+from soundcloud_tools.ranking import RELEASE_TYPE_PRESETS, Weights, rank_tracks
+from soundcloud_tools.snapshot import SnapshotTrack, Surfacing, WeeklySnapshot
+from soundcloud_tools.sync import STREAM_PAGE_SIZE, StreamSync, is_before
 from soundcloud_tools.utils import (
     Weekday,
     get_scheduled_time,
     get_unique_track_ids,
     get_week_of_month,
-    sort_tracks_by_follower_count,
-    sort_tracks_by_playcount,
 )
 
 logger = logging.getLogger(__name__)
 
 
-Items = StreamItemType | Literal["comment"]
+Items = StreamItemType | Literal["comment", "story"]
 
 
 async def get_collections(
     client: Client, user_id: int, start: datetime, end: datetime, exclude_own: bool = True
-) -> list[StreamItem | Comment]:
+) -> list[StreamItemCore | Comment]:
     reposts = await get_reposts(client, user_id, start, end, exclude_own)
     comments = await get_comments(client, user_id, start, end, exclude_own)
     return reposts + comments
 
 
-async def get_stories(client: Client, start: datetime, end: datetime) -> list[Story]:
+async def get_stories(client: Client, start: datetime, end: datetime, concurrency: int = 8) -> list[Story]:
+    """Fetches the stories of all artist shortcuts concurrently.
+
+    Artists without updates since `start` are skipped, at most `concurrency` requests are in flight.
+    """
     artist_shortcuts = await client.get_artist_shortcuts()
-    all_stories = []
-    for artist_shortcut in artist_shortcuts.collection:
-        logger.info(f"Fetching stories for {artist_shortcut.user.username}")
-        response = await client.get_artist_shortcut_stories(user_urn=artist_shortcut.user.urn)
-        logger.info(f"Found {len(response.stories)} stories for {artist_shortcut.user.username}")
-        stories = [s for s in response.stories if start < s.created_at < end]
+    users = [s.user for s in artist_shortcuts.collection if s.unread_update_at is None or s.unread_update_at >= start]
+    logger.info(f"Fetching stories for {len(users)} of {len(artist_shortcuts.collection)} artists")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get_user_stories(user: User) -> list[Story]:
+        async with semaphore:
+            response = await client.get_artist_shortcut_stories(user_urn=user.urn)
+        logger.info(f"Found {len(response.stories)} stories for {user.username}")
+        return [s for s in response.stories if start < s.created_at < end]
+
+    all_stories: list[Story] = []
+    tasks = [get_user_stories(user) for user in users]
+    for n, task in enumerate(asyncio.as_completed(tasks), start=1):
+        stories = await task
         all_stories += stories
+        logger.info(f"Found {len(stories)} valid stories ({n}/{len(tasks)} artists, total = {len(all_stories)})")
     return all_stories
 
 
 async def get_all_user_likes(client: Client, user_id: int) -> list[Track]:
-    limit = 200
-    offset: str | None = None
-    all_tracks = []
-    while True:
-        response: Stream = await client.get_user_likes(user_id=user_id, limit=limit, offset=offset)
-        tracks = [like.track for like in response.collection if hasattr(like, "track")]
-        all_tracks += tracks
-        logger.info(f"Found {len(tracks)} valid likes ({offset = }, total = {len(all_tracks)})")
-        if not tracks:
-            break
-        offset = client.get_next_offset(response.next_href)
-    return all_tracks
+    all_likes = []
+    async for response in client.paginate(client.get_user_likes, user_id=user_id, limit=200):
+        likes = [like for like in response.collection if hasattr(like, "track")]
+        all_likes += likes
+        logger.info(f"Found {len(likes)} valid likes (total = {len(all_likes)})")
+    return [like.track for like in all_likes]
 
 
 async def get_reposts(
-    client: Client, user_id: int, start: datetime, end: datetime, exclude_own: bool = True
-) -> list[StreamItem]:
-    limit = 200
-    offset: int = 0
-    user_urn = f"soundcloud:users:{user_id}"
-    n_zero = 0
-    all_reposts: list[StreamItem] = []
-    while True:
-        response: Stream = await client.get_stream(user_urn=user_urn, limit=limit, offset=offset)
-        reposts = [
-            c
-            for c in response.collection
-            if start < c.created_at < end and (c.user.id != user_id if exclude_own else True)
-        ]
-        logger.info(f"Found {len(reposts)} valid reposts ({offset = }, total = {len(all_reposts)})")
-        all_reposts += reposts
-        if not reposts and all_reposts:
-            break
-        if not reposts:
-            n_zero += 1
-        if n_zero > 10:
-            break
-        offset += limit
-    return all_reposts
+    client: Client,
+    user_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_own: bool = True,
+    stream_sync: StreamSync | None = None,
+) -> list[StreamItemCore]:
+    return [c async for c in iter_reposts(client, user_id, start, end, exclude_own, stream_sync)]
+
+
+async def iter_reposts(
+    client: Client,
+    user_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_own: bool = True,
+    stream_sync: StreamSync | None = None,
+) -> AsyncIterator[StreamItemCore]:
+    """Yields the valid stream items page by page."""
+
+    def is_valid(c: StreamItemCore) -> bool:
+        return start < c.created_at < end and (c.user.id != user_id if exclude_own else True)
+
+    if stream_sync:
+        reposts = [c for c in await stream_sync.sync(client, start=start) if is_valid(c)]
+        logger.info(f"Found {len(reposts)} valid reposts (incremental)")
+        for c in reposts:
+            yield c
+        return
+
+    limit = STREAM_PAGE_SIZE
+    total = 0
+    pages = client.paginate(
+        client.get_stream,
+        # The stream is ordered newest first, nothing valid follows a page before `start`
+        until=lambda response: is_before(response, start),
+        step=limit,
+        user_urn=f"soundcloud:users:{user_id}",
+        limit=limit,
+        offset=0,
+        projection="core",
+    )
+    async for response in pages:
+        reposts = [c for c in response.collection if is_valid(c)]
+        total += len(reposts)
+        logger.info(f"Found {len(reposts)} valid reposts (page = {pages.pages}, total = {total})")
+        for c in reposts:
+            yield c
+
+
+async def get_user_comments_in_timespan(
+    client: Client, user_id: int, start: datetime, end: datetime, exclude_user_id: int | None = None
+) -> list[Comment]:
+    all_comments: list[Comment] = []
+
+    def is_valid(comment: Comment) -> bool:
+        return start < comment.created_at < end and comment.user.id != exclude_user_id
+
+    pages = client.paginate(
+        client.get_user_comments,
+        until=lambda response: not any(map(is_valid, response.collection)),
+        user_id=user_id,
+        limit=200,
+    )
+    async for response in pages:
+        all_comments += [c for c in response.collection if is_valid(c)]
+    return all_comments
 
 
 async def get_comments(
     client: Client, user_id: int, start: datetime, end: datetime, exclude_own: bool = True
 ) -> list[Comment]:
-    all_comments: list[StreamItem] = []
+    """Fetches the comments of all followings concurrently.
+
+    The number of requests in flight is bounded by the client's per-host limit,
+    each following is paged in order and results are merged as they arrive.
+    """
+    all_comments: list[Comment] = []
     followings = await client.get_user_followings_ids(user_id=user_id)
-    for user_id in followings.collection:
-        limit = 200
-        offset: str | None = None
-        while True:
-            response: Stream = await client.get_user_comments(user_id=user_id, limit=limit, offset=offset)
-            comments = [
-                c
-                for c in response.collection
-                if start < c.created_at < end and (c.user.id != user_id if exclude_own else True)
-            ]
-            logger.info(f"Found {len(comments)} valid comments ({offset = }, total = {len(all_comments)})")
-            all_comments += comments
-            if not comments:
-                break
-            offset = client.get_next_offset(response.next_href)
+    exclude_user_id = user_id if exclude_own else None
+    tasks = [
+        get_user_comments_in_timespan(client, following_id, start=start, end=end, exclude_user_id=exclude_user_id)
+        for following_id in followings.collection
+    ]
+    for n, task in enumerate(asyncio.as_completed(tasks), start=1):
+        comments = await task
+        all_comments += comments
+        logger.info(f"Found {len(comments)} valid comments ({n}/{len(tasks)} users, total = {len(all_comments)})")
     return all_comments
 
 
@@ -122,8 +179,16 @@ async def get_recent_weekly_track_ids(client: Client, user_id: int) -> set[int]:
     }
 
 
-def get_tracks_from_collections(collections: list[StreamItem | Comment], types: list[Items]) -> list[Track]:
-    tracks: list[Track] = []
+async def get_seen_track_ids(client: Client, user_id: int, seen_index: SeenTrackIndex | None = None) -> Collection[int]:
+    if seen_index:
+        return await seen_index.sync(client)
+    return await get_recent_weekly_track_ids(client=client, user_id=user_id)
+
+
+def get_tracks_from_collections(
+    collections: list[StreamItemCore | Comment], types: list[Items]
+) -> list[TrackCore | TrackSlim]:
+    tracks: list[TrackCore | TrackSlim] = []
     for c in collections:
         if c.type not in types:
             continue
@@ -136,6 +201,16 @@ def get_tracks_from_collections(collections: list[StreamItem | Comment], types:
     return tracks
 
 
+def get_tracks_from_stories(stories: list[Story]) -> list[Track | TrackSlim]:
+    tracks: list[Track | TrackSlim] = []
+    for c in stories:
+        if c.type.startswith("playlist"):
+            tracks += c.playlist.tracks
+        if c.type.startswith("track"):
+            tracks.append(c.snippeted_track)
+    return tracks
+
+
 def get_track_ids_from_stories(stories: list[Story], types: list[StoryType]) -> set[int]:
     track_ids = set()
     for c in stories:
@@ -148,24 +223,46 @@ def get_track_ids_from_stories(stories: list[Story], types: list[StoryType]) ->
     return track_ids
 
 
-async def get_tracks_ids_in_timespan(
-    client: Client, user_id: int, start: datetime, end: datetime, types: list[Items]
-) -> list[Track]:
-    tracks = []
+async def iter_candidates(
+    client: Client,
+    user_id: int,
+    start: datetime,
+    end: datetime,
+    types: list[Items],
+    stream_sync: StreamSync | None = None,
+) -> AsyncIterator[Candidate]:
+    """Yields the tracks of all sources as slim candidates while the sources are paged."""
     if "track" in types or "track-repost" in types:
-        reposts = await get_reposts(client, user_id=user_id, start=start, end=end, exclude_own=True)
-        tracks += get_tracks_from_collections(reposts, types=types)
+        async for c in iter_reposts(client, user_id, start=start, end=end, exclude_own=True, stream_sync=stream_sync):
+            for track in get_tracks_from_collections([c], types=types):
+                yield Candidate.from_track(track)
     if "comment" in types:
-        collections = await get_comments(client, user_id, start=start, end=end, exclude_own=True)
-        tracks += get_tracks_from_collections(collections, types=types)
-    logger.info(f"Found {len(tracks)} tracks")
-    return tracks
+        for track in get_tracks_from_collections(
+            await get_comments(client, user_id, start=start, end=end, exclude_own=True), types=types
+        ):
+            yield Candidate.from_track(track)
+    if "story" in types:
+        for track in get_tracks_from_stories(await get_stories(client, start=start, end=end)):
+            yield Candidate.from_track(track)
 
 
-def filter_tracks_for_duration(tracks: list[Track], max_duration: int) -> list[Track]:
-    ftracks = [track for track in tracks if getattr(track, "duration_s", 0) < max_duration]
-    logger.info(f"Filtered to {len(ftracks)} tracks with duration < {max_duration}")
-    return ftracks
+async def get_excluded_track_ids(
+    client: Client,
+    user_id: int,
+    exclude_liked: bool = False,
+    snapshot: WeeklySnapshot | None = None,
+    liked_index: LikedTrackIndex | None = None,
+    seen_index: SeenTrackIndex | None = None,
+) -> list[Container[int]]:
+    """Returns the seen and, if `exclude_liked`, the liked track IDs."""
+    if snapshot:
+        if exclude_liked and snapshot.liked_track_ids is None:
+            raise ValueError("Snapshot was collected without liked tracks, create it with --exclude-liked")
+        return [snapshot.seen_track_ids, *([snapshot.liked_track_ids or set()] if exclude_liked else [])]
+    lookups = [get_seen_track_ids(client, user_id=user_id, seen_index=seen_index)]
+    if exclude_liked:
+        lookups.append(get_liked_track_ids(client, user_id=user_id, liked_index=liked_index))
+    return list(await asyncio.gather(*lookups))
 
 
 def filter_tracks_for_date(tracks: list[Track], start: datetime | None, end: datetime | None) -> list[Track]:
@@ -176,78 +273,44 @@ def filter_tracks_for_date(tracks: list[Track], start: datetime | None, end: dat
     return ftracks
 
 
-async def filter_tracks_for_seen(client: Client, tracks: list[Track], user_id: int) -> list[Track]:
-    seen_track_ids = await get_recent_weekly_track_ids(client=client, user_id=user_id)
-    logger.info(f"Found {len(seen_track_ids)} seen tracks")
-    ftracks = [track for track in tracks if track.id not in seen_track_ids]
-    logger.info(f"Filtered to {len(ftracks)} unseen tracks")
-    return ftracks
-
-
-async def filter_tracks_for_liked(client: Client, tracks: list[Track], user_id: int) -> list[Track]:
-    logger.info("Removing likes tracks")
+async def get_liked_track_ids(
+    client: Client, user_id: int, liked_index: LikedTrackIndex | None = None
+) -> Collection[int]:
+    if liked_index:
+        return await liked_index.sync(client)
     liked_tracks = await get_all_user_likes(client, user_id=user_id)
-    liked_track_ids = {track.id for track in liked_tracks}
-    ftracks = [track for track in tracks if track.id not in liked_track_ids]
-    logger.info(f"Filtered to {len(ftracks)} tracks after removing liked tracks")
-    return ftracks
-
-
-def get_ordered_track_ids(tracks: list[Track]) -> list[int]:
-    track_ids = [track.id for track in tracks]
-    return [track_id for track_id, _ in Counter(track_ids).most_common()]
-
-
-async def create_weekly_favorite_playlist(
-    client: Client,
-    user_id: int,
-    types: list[Items],
-    week: int = 0,
-    exclude_liked: bool = False,
-    half: Literal["first", "second"] | None = None,
-    max_duration: int = 600,  # 10 minutes
-    release_type: Literal["new", "old"] | None = None,
-    dry_run: bool = False,
-):
-    logger.info(f"Creating weekly favorite playlist for {week = } and {types = }")
-    start = get_scheduled_time(Weekday.SUNDAY, weeks=week - 1)
-    end = get_scheduled_time(Weekday.SUNDAY, weeks=week)
-    month, week_of_month = end.strftime("%b"), get_week_of_month(end)
-    match half:
-        case "first":
-            end -= (end - start) / 2
-        case "second":
-            start += (end - start) / 2
+    return {track.id for track in liked_tracks}
 
-    logger.info(f"Collecting favorites for {start.date()} - {end.date()}")
-
-    # Filter tracks
-    tracks = await get_tracks_ids_in_timespan(client, user_id=user_id, start=start, end=end, types=types)
-    tracks = filter_tracks_for_duration(tracks=tracks, max_duration=max_duration)
-    tracks = await filter_tracks_for_seen(client=client, tracks=tracks, user_id=user_id)
-    if exclude_liked:
-        tracks = await filter_tracks_for_liked(client=client, tracks=tracks, user_id=user_id)
-    logger.info(f"Found {len(tracks)} tracks after filtering")
 
-    # Get tracks with full info
-    tracks = await client.get_all_tracks(track_ids=get_unique_track_ids(tracks))
+def sort_tracks_for_release_type(
+    tracks: list[Track],
+    release_type: Literal["new", "old"] | None,
+    start: datetime,
+    end: datetime,
+    ranking: Weights | str | None = None,
+    frequency: Mapping[int, int] | None = None,
+) -> list[Track]:
+    """Filters the tracks for the release type and ranks them, by default with the release type's preset."""
     match release_type:
         case "new":
             tracks = filter_tracks_for_date(tracks=tracks, start=start, end=end)
-            tracks = sort_tracks_by_follower_count(tracks=tracks)
         case "old":
             tracks = filter_tracks_for_date(tracks=tracks, start=None, end=start)
-            tracks = sort_tracks_by_playcount(tracks=tracks)
-        case _:
-            tracks = sort_tracks_by_playcount(tracks=tracks)
+    return rank_tracks(tracks, weights=ranking or RELEASE_TYPE_PRESETS[release_type], frequency=frequency)
 
-    track_ids = get_unique_track_ids(tracks)
-    logger.info(f"Found {len(track_ids)} new unique tracks")
 
-    # Create playlist from track_ids
+def create_playlist_request(
+    track_ids: list[int],
+    week: int = 0,
+    half: Literal["first", "second"] | None = None,
+    release_type: Literal["new", "old"] | None = None,
+) -> PlaylistCreateRequest:
+    _, week_end = get_week_timespan(week)
+    month, week_of_month = week_end.strftime("%b"), get_week_of_month(week_end)
+    start, end = get_week_timespan(week, half=half)
     week_prefix = f"{half.title()} half of " if half else " "
     week_suffix = "/1" if half == "first" else "/2" if half == "second" else ""
-    playlist = PlaylistCreateRequest(
+    return PlaylistCreateRequest(
         playlist=PlaylistCreate(
             title=(
                 f"{release_type.title() + ' ' if release_type else ''}"
@@ -263,11 +326,243 @@ async def create_weekly_favorite_playlist(
             tag_list=f"soundcloud-archive,weekly-favorites,{month.upper()}/{week_of_month},CW{start.isocalendar().week}",
         )
     )
+
+
+def get_run_name(
+    user_id: int,
+    types: list[Items],
+    week: int = 0,
+    half: Literal["first", "second"] | None = None,
+    release_type: Literal["new", "old"] | None = None,
+) -> str:
+    start, _ = get_week_timespan(week)
+    return f"weekly-{user_id}-{start.date()}-{half or 'full'}-{release_type or 'all'}-{'-'.join(sorted(types))}"
+
+
+def get_week_timespan(week: int = 0, half: Literal["first", "second"] | None = None) -> tuple[datetime, datetime]:
+    start = get_scheduled_time(Weekday.SUNDAY, weeks=week - 1)
+    end = get_scheduled_time(Weekday.SUNDAY, weeks=week)
+    match half:
+        case "first":
+            end -= (end - start) / 2
+        case "second":
+            start += (end - start) / 2
+    return start, end
+
+
+async def collect_weekly_snapshot(
+    client: Client,
+    user_id: int,
+    types: list[Items],
+    week: int = 0,
+    exclude_liked: bool = False,
+    stream_sync: StreamSync | None = None,
+    liked_index: LikedTrackIndex | None = None,
+    seen_index: SeenTrackIndex | None = None,
+    weeks: range | None = None,
+) -> WeeklySnapshot:
+    """Collects and enriches all candidates of the full week, or of all `weeks`, without applying any filters."""
+    weeks = weeks or range(week, week + 1)
+    start, _ = get_week_timespan(min(weeks))
+    _, end = get_week_timespan(max(weeks))
+    logger.info(f"Collecting snapshot for {start.date()} - {end.date()}")
+    with client.metrics.phase("collect"):
+        collections: list[StreamItemCore | Comment] = []
+        if "track" in types or "track-repost" in types:
+            collections += await get_reposts(
+                client, user_id=user_id, start=start, end=end, exclude_own=True, stream_sync=stream_sync
+            )
+        if "comment" in types:
+            collections += await get_comments(client, user_id, start=start, end=end, exclude_own=True)
+        stories = await get_stories(client, start=start, end=end) if "story" in types else []
+    surfaced: dict[int, list[Surfacing]] = defaultdict(list)
+    for c in collections:
+        for track in get_tracks_from_collections([c], types=types):
+            surfaced[track.id].append(Surfacing(type=c.type, at=c.created_at))
+    for story in stories:
+        for track in get_tracks_from_stories([story]):
+            surfaced[track.id].append(Surfacing(type="story", at=story.created_at))
+    with client.metrics.phase("seen_filter"):
+        seen_track_ids = set(await get_seen_track_ids(client=client, user_id=user_id, seen_index=seen_index))
+    liked_track_ids = None
+    if exclude_liked:
+        with client.metrics.phase("liked_filter"):
+            liked_track_ids = set(await get_liked_track_ids(client, user_id=user_id, liked_index=liked_index))
+    with client.metrics.phase("enrichment"):
+        tracks = await client.get_all_tracks(track_ids=list(surfaced))
+    return WeeklySnapshot(
+        user_id=user_id,
+        start=start,
+        end=end,
+        types=list(types),
+        tracks=[SnapshotTrack(track=track, surfaced=surfaced[track.id]) for track in tracks],
+        seen_track_ids=seen_track_ids,
+        liked_track_ids=liked_track_ids,
+    )
+
+
+async def post_playlist(client: Client, playlist: PlaylistCreateRequest) -> int:
+    with client.metrics.phase("post"):
+        created = await client.post_playlist(data=playlist)
+    return created.id
+
+
+def mark_as_seen(
+    track_ids: list[int],
+    playlist_id: int,
+    seen_index: SeenTrackIndex | None = None,
+    snapshot: WeeklySnapshot | None = None,
+):
+    """Excludes the posted tracks from later playlists, repeating it for the same playlist is a no-op."""
+    if seen_index:
+        seen_index.add(track_ids, playlist_id=playlist_id)
+    if snapshot:
+        # Later playlists derived from the snapshot must not repeat these tracks
+        snapshot.seen_track_ids |= set(track_ids)
+        snapshot.save()
+
+
+async def create_weekly_favorite_playlist(
+    client: Client,
+    user_id: int,
+    types: list[Items],
+    week: int = 0,
+    exclude_liked: bool = False,
+    half: Literal["first", "second"] | None = None,
+    max_duration: int = 600,  # 10 minutes
+    release_type: Literal["new", "old"] | None = None,
+    dry_run: bool = False,
+    stream_sync: StreamSync | None = None,
+    snapshot: WeeklySnapshot | None = None,
+    liked_index: LikedTrackIndex | None = None,
+    seen_index: SeenTrackIndex | None = None,
+    checkpoints: Checkpoints | None = None,
+    ranking: Weights | str | None = None,
+):
+    """Creates the weekly favorites playlist, derived from `snapshot` without collecting if given.
+
+    Sources are filtered per item while they are paged, only slim candidates are kept until
+    enrichment. With `checkpoints` the results of the collect, enrich and post stages are stored,
+    a resumed run continues after the last completed stage. Tracks are ordered by `ranking`,
+    a preset name or custom weights, and by the release type's preset otherwise.
+    """
+    logger.info(f"Creating weekly favorite playlist for {week = } and {types = }")
+    start, end = get_week_timespan(week, half=half)
+
+    logger.info(f"Collecting favorites for {start.date()} - {end.date()}")
+
+    async def collect() -> list[Candidate]:
+        # Seen and liked tracks are fetched while the sources are paged
+        excluded = asyncio.ensure_future(
+            get_excluded_track_ids(client, user_id, exclude_liked, snapshot, liked_index, seen_index)
+        )
+
+        async def is_new(c: Candidate) -> bool:
+            return not any(c.id in track_ids for track_ids in await excluded)
+
+        with client.metrics.phase("collect"):
+            try:
+                if snapshot:
+                    candidates = snapshot.iter_candidates(start=start, end=end, types=types)
+                else:
+                    candidates = iter_candidates(client, user_id, start, end, types=types, stream_sync=stream_sync)
+                candidates = afilter(candidates, lambda c: c.duration_s < max_duration)
+                filtered = await merge_candidates(afilter(candidates, is_new))
+                # Surfaces lookup errors even if there were no candidates
+                await excluded
+                return filtered
+            finally:
+                excluded.cancel()
+
+    async def enrich() -> list[Track]:
+        logger.info(f"Found {len(collected)} tracks after filtering")
+        # Snapshot tracks are already complete
+        if snapshot:
+            return snapshot.get_tracks_by_id([c.id for c in collected])
+        with client.metrics.phase("enrichment"):
+            return await client.get_all_tracks(track_ids=[c.id for c in collected])
+
+    # Collect and filter candidates, then get them with full info
+    collected = await run_stage(checkpoints, "collect", list[Candidate], collect)
+    tracks = await run_stage(checkpoints, "enrich", list[Track], enrich)
+    with client.metrics.phase("sort"):
+        frequency = {c.id: c.surfaced for c in collected}
+        tracks = sort_tracks_for_release_type(
+            tracks, release_type=release_type, start=start, end=end, ranking=ranking, frequency=frequency
+        )
+
+    track_ids = get_unique_track_ids(tracks)
+    logger.info(f"Found {len(track_ids)} new unique tracks")
+    if not track_ids:
+        logger.warning(f"No new tracks for {week = }, not creating a playlist")
+        return track_ids
+
+    # Create playlist from track_ids
+    playlist = create_playlist_request(track_ids, week=week, half=half, release_type=release_type)
     request = devtools.pformat(playlist.model_dump(exclude={"playlist": {"tracks"}}))
     logger.info(f"Creating playlist {request} with {len(playlist.playlist.tracks)} tracks")
     if dry_run:
         logger.info("Dry run, not creating playlist")
         return track_ids
-    # Create playlist
-    await client.post_playlist(data=playlist)
+
+    # Create playlist, a resumed run does not post it again but still marks its tracks as seen
+    playlist_id = await run_stage(checkpoints, "post", int, lambda: post_playlist(client, playlist))
+    mark_as_seen(playlist.playlist.tracks, playlist_id, seen_index=seen_index, snapshot=snapshot)
+    return track_ids
+
+
+async def create_weekly_favorite_playlists(
+    client: Client,
+    user_id: int,
+    types: list[Items],
+    weeks: range,
+    exclude_liked: bool = False,
+    stream_sync: StreamSync | None = None,
+    liked_index: LikedTrackIndex | None = None,
+    seen_index: SeenTrackIndex | None = None,
+    resume: bool = False,
+    **kwargs,
+) -> dict[int, list[int]]:
+    """Creates the playlists of multiple weeks from a single collection pass over all of them.
+
+    Each week has its own checkpoints, which are only cleared once all weeks are done. A resumed
+    run reuses the stored snapshot and does not post the playlists of completed weeks again.
+    """
+    start, _ = get_week_timespan(min(weeks))
+    _, end = get_week_timespan(max(weeks))
+    snapshot = WeeklySnapshot.load(user_id, start=start, end=end) if resume else None
+    if snapshot is None:
+        snapshot = await collect_weekly_snapshot(
+            client,
+            user_id=user_id,
+            types=types,
+            weeks=weeks,
+            exclude_liked=exclude_liked,
+            stream_sync=stream_sync,
+            liked_index=liked_index,
+            seen_index=seen_index,
+        )
+        snapshot.save()
+    checkpoints = {
+        week: Checkpoints(
+            get_run_name(user_id, types, week=week, half=kwargs.get("half"), release_type=kwargs.get("release_type")),
+            resume=resume,
+        )
+        for week in weeks
+    }
+    track_ids = {}
+    for week in sorted(weeks):
+        track_ids[week] = await create_weekly_favorite_playlist(
+            client,
+            user_id=user_id,
+            types=types,
+            week=week,
+            exclude_liked=exclude_liked,
+            snapshot=snapshot,
+            seen_index=seen_index,
+            checkpoints=checkpoints[week],
+            **kwargs,
+        )
+    for week_checkpoints in checkpoints.values():
+        week_checkpoints.clear()
     return track_ids
@@ -0,0 +1,32 @@
+import os
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+import pytest
+
+# Settings are read at import time, the tests never send requests to the API
+os.environ.update(OAUTH_TOKEN="test", CLIENT_ID="test", USER_ID="1", RATE_LIMIT="1000")
+
+from soundcloud_tools.client import Client
+from soundcloud_tools.settings import get_settings
+
+
+@pytest.fixture
+def run_client() -> Callable[..., Any]:
+    """Runs `func` with a client whose requests are answered by `handler` instead of the API."""
+
+    def run(
+        handler: Callable[[httpx.Request], httpx.Response], func: Callable[[Client], Awaitable[Any]], **kwargs
+    ) -> Any:
+        client = Client(transport=httpx.MockTransport(handler), **kwargs)
+        return client.run(func(client))
+
+    return run
+
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    """Keeps the local state of the code under test in `tmp_path`."""
+    monkeypatch.setattr(get_settings(), "data_dir", str(tmp_path))
+    return tmp_path
@@ -0,0 +1,55 @@
+"""Fake API endpoints for `httpx.MockTransport`, their handlers answer the requests of a client."""
+
+import json
+from collections.abc import Iterable
+
+import httpx
+
+from tests.payloads import playlist
+
+
+class FakeCollection:
+    """Collection endpoint over `items` (newest first), paged by the offset in `next_href`."""
+
+    def __init__(self, items: list[dict]):
+        self.items = items
+        self.offsets: list[int] = []
+
+    def page(self, request: httpx.Request) -> httpx.Response:
+        offset, limit = int(request.url.params.get("offset") or 0), int(request.url.params["limit"])
+        self.offsets.append(offset)
+        more = offset + limit < len(self.items)
+        next_href = str(request.url.copy_set_param("offset", offset + limit)) if more else None
+        return httpx.Response(200, json={"collection": self.items[offset : offset + limit], "next_href": next_href})
+
+
+class FakePlaylists:
+    """Playlists endpoints of user 1, returning each playlist with its tracks.
+
+    Posting fails with a lost connection once `fail_after` playlists were posted.
+    """
+
+    def __init__(self, playlists: Iterable[dict] = (), fail_after: int | None = None):
+        self.playlists = {p["id"]: p for p in playlists}
+        self.fetched: list[int] = []
+        self.posted: list[list[int]] = []
+        self.fail_after = fail_after
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return self.post(request)
+        if request.url.path == "/users/1/playlists_without_albums":
+            collection = [p | {"tracks": []} for p in self.playlists.values()]
+            return httpx.Response(200, json={"collection": collection, "next_href": None, "query_urn": None})
+        playlist_id = int(request.url.path.rsplit("/", 1)[1])
+        self.fetched.append(playlist_id)
+        return httpx.Response(200, json=self.playlists[playlist_id])
+
+    def post(self, request: httpx.Request) -> httpx.Response:
+        if self.fail_after is not None and len(self.posted) >= self.fail_after:
+            raise RuntimeError("Connection lost")
+        data = json.loads(request.content)["playlist"]
+        self.posted.append(data["tracks"])
+        playlist_id = 1000 + len(self.posted)
+        self.playlists[playlist_id] = playlist(playlist_id, data["title"], data["tracks"])
+        return httpx.Response(200, json=self.playlists[playlist_id])
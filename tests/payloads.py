@@ -0,0 +1,120 @@
+"""Minimal API payloads that validate into the full response models."""
+
+from datetime import datetime, timezone
+
+NOW = datetime.now(tz=timezone.utc)
+
+
+def user(user_id: int, likes_count: int) -> dict:
+    return {
+        "avatar_url": "https://i1.sndcdn.com/avatars-large.jpg",
+        "first_name": "",
+        "followers_count": 0,
+        "full_name": "",
+        "id": user_id,
+        "kind": "user",
+        "last_modified": NOW.isoformat(),
+        "last_name": "",
+        "permalink": f"user-{user_id}",
+        "permalink_url": f"https://soundcloud.com/user-{user_id}",
+        "uri": f"https://api.soundcloud.com/users/{user_id}",
+        "urn": f"soundcloud:users:{user_id}",
+        "username": f"user-{user_id}",
+        "verified": False,
+        "city": None,
+        "country_code": None,
+        "badges": {"pro": False, "creator_mid_tier": False, "pro_unlimited": False, "verified": False},
+        "station_urn": "",
+        "station_permalink": "",
+        "likes_count": likes_count,
+    }
+
+
+def playlist(playlist_id: int, title: str, track_ids: list[int]) -> dict:
+    return {
+        "artwork_url": None,
+        "created_at": NOW.isoformat(),
+        "duration": 0,
+        "id": playlist_id,
+        "kind": "playlist",
+        "last_modified": NOW.isoformat(),
+        "managed_by_feeds": False,
+        "permalink": f"playlist-{playlist_id}",
+        "permalink_url": f"https://soundcloud.com/user-1/sets/playlist-{playlist_id}",
+        "public": False,
+        "release_date": None,
+        "secret_token": None,
+        "sharing": "private",
+        "title": title,
+        "uri": f"https://api.soundcloud.com/playlists/{playlist_id}",
+        "user_id": 1,
+        "set_type": "",
+        "is_album": False,
+        "published_at": None,
+        "display_date": NOW.isoformat(),
+        "user": user(1, likes_count=0),
+        "tracks": [{"id": i, "kind": "track", "monetization_model": "", "policy": ""} for i in track_ids],
+        "track_count": len(track_ids),
+    }
+
+
+def track(track_id: int, title: str = "", username: str = "artist") -> dict:
+    """Slim track, valid as a `TrackCore` projection."""
+    return {
+        "id": track_id,
+        "kind": "track",
+        "title": title or f"track-{track_id}",
+        "genre": "Techno",
+        "duration": 300_000,
+        "created_at": NOW.isoformat(),
+        "playback_count": 10,
+        "likes_count": 2,
+        "reposts_count": 1,
+        "user": {"id": 1, "kind": "user", "username": username, "followers_count": 5},
+    }
+
+
+def full_track(track_id: int, created_at: datetime = NOW) -> dict:
+    """Complete track as returned by the tracks endpoint."""
+    return {
+        **track(track_id),
+        "artwork_url": None,
+        "caption": None,
+        "commentable": True,
+        "comment_count": 0,
+        "created_at": created_at.isoformat(),
+        "description": None,
+        "downloadable": False,
+        "download_count": None,
+        "full_duration": 300_000,
+        "embeddable_by": "all",
+        "has_downloads_left": False,
+        "label_name": None,
+        "last_modified": NOW.isoformat(),
+        "license": "all-rights-reserved",
+        "permalink": f"track-{track_id}",
+        "permalink_url": f"https://soundcloud.com/user-1/track-{track_id}",
+        "public": True,
+        "publisher_metadata": None,
+        "purchase_title": None,
+        "purchase_url": None,
+        "release_date": None,
+        "secret_token": None,
+        "sharing": "public",
+        "state": "finished",
+        "streamable": True,
+        "tag_list": "",
+        "uri": f"https://api.soundcloud.com/tracks/{track_id}",
+        "urn": f"soundcloud:tracks:{track_id}",
+        "user_id": 1,
+        "visuals": None,
+        "waveform_url": "",
+        "display_date": created_at.isoformat(),
+        "media": {"transcodings": []},
+        "station_urn": "",
+        "station_permalink": "",
+        "track_authorization": "",
+        "monetization_model": "",
+        "policy": "",
+        "user": user(1, likes_count=0),
+    }
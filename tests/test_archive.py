@@ -0,0 +1,66 @@
+import struct
+
+import numpy as np
+import pytest
+
+from soundcloud_tools import archive
+from soundcloud_tools.archive import CollectionArchive, diff_tables, load_archive, write_archive
+from soundcloud_tools.models.core import LikeCore, TrackCore
+from soundcloud_tools.models.table import TrackTable
+from tests.payloads import NOW, track
+
+
+def likes(track_ids: list[int]) -> list[LikeCore]:
+    return [LikeCore(created_at=NOW, track=TrackCore.model_validate(track(i))) for i in track_ids]
+
+
+def test_round_trip(tmp_path):
+    items = likes([3, 1, 2])
+    header = write_archive(tmp_path / "likes.scta", items)
+
+    loaded = CollectionArchive(tmp_path / "likes.scta")
+    expected = TrackTable.from_items(items)
+    assert header.kind == "like-core"
+    assert len(loaded) == 3
+    for name, values in expected.columns.items():
+        np.testing.assert_array_equal(loaded.table[name], values)
+    assert [item.model_dump() for item in loaded.table.items] == [item.model_dump() for item in items]
+
+
+def test_items_are_validated_lazily(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "CHUNK_SIZE", 2)
+    write_archive(tmp_path / "likes.scta", likes([1, 2, 3, 4, 5]))
+
+    loaded = CollectionArchive(tmp_path / "likes.scta")
+    table = loaded.table
+    assert table["id"].tolist() == [1, 2, 3, 4, 5]
+    assert not loaded.validated and not loaded.chunks
+
+    assert table.items[4].track.id == 5
+    assert list(loaded.validated) == [4]
+    assert list(loaded.chunks) == [2]
+    assert [item.track.id for item in table.items[1:3]] == [2, 3]
+
+
+def test_diff_tables():
+    old = TrackTable.from_items(likes([1, 2, 3]))
+    new = TrackTable.from_items(likes([2, 3, 4, 5]))
+
+    diff = diff_tables(old, new)
+    assert diff.added == [4, 5]
+    assert diff.removed == [1]
+
+
+def test_rejects_other_versions(tmp_path):
+    path = tmp_path / "likes.scta"
+    write_archive(path, likes([1]))
+    with path.open("r+b") as f:
+        f.seek(len(archive.MAGIC))
+        f.write(struct.pack("<H", archive.FORMAT_VERSION + 1))
+
+    with pytest.raises(ValueError, match="Unsupported collection archive version"):
+        CollectionArchive(path)
+
+
+def test_load_missing_archive(tmp_path):
+    assert load_archive(tmp_path / "missing.scta") is None
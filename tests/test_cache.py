@@ -0,0 +1,95 @@
+import httpx
+import pytest
+
+from soundcloud_tools.cache import NO_CACHE, SQLiteResponseCache
+from soundcloud_tools.client import Client
+from tests.payloads import user
+
+
+class FakeUsers:
+    """User endpoint with an ETag per version of the user, answering matching revalidations with 304."""
+
+    def __init__(self):
+        self.followers = 10
+        self.requests: list[httpx.Request] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        etag = f'"v{self.followers}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, json=user(1, 0) | {"followers_count": self.followers}, headers={"etag": etag})
+
+
+@pytest.fixture
+def cache(tmp_path) -> SQLiteResponseCache:
+    return SQLiteResponseCache(tmp_path / "responses.sqlite", ttls={r"^users/\d+$": 60})
+
+
+def run(cache: SQLiteResponseCache, users: FakeUsers, *calls):
+    client = Client(cache=cache, transport=httpx.MockTransport(users.handler))
+
+    async def main():
+        return [await call(client) for call in calls]
+
+    return client.run(main())
+
+
+def get_user(client: Client, **kwargs):
+    return client.get_user(user_id=1, **kwargs)
+
+
+def expire(cache: SQLiteResponseCache):
+    with cache.db:
+        cache.db.execute("UPDATE responses SET expires_at = 0")
+
+
+def test_fresh_responses_are_served_from_the_cache(cache):
+    users = FakeUsers()
+    first, second = run(cache, users, get_user, get_user)
+
+    assert first.followers_count == second.followers_count == 10
+    assert len(users.requests) == 1
+
+
+def test_stale_responses_are_revalidated(cache):
+    users = FakeUsers()
+    run(cache, users, get_user)
+    expire(cache)
+
+    # Unchanged, the server confirms the cached response
+    assert run(cache, users, get_user)[0].followers_count == 10
+    assert users.requests[-1].headers["if-none-match"] == '"v10"'
+    assert len(users.requests) == 2
+
+    # Served from the cache again after the revalidation refreshed it
+    run(cache, users, get_user)
+    assert len(users.requests) == 2
+
+    expire(cache)
+    users.followers = 20
+    assert run(cache, users, get_user)[0].followers_count == 20
+    assert len(users.requests) == 3
+
+
+def test_no_cache_revalidates_fresh_responses(cache):
+    users = FakeUsers()
+    run(cache, users, get_user)
+    users.followers = 20
+
+    (current,) = run(cache, users, lambda client: get_user(client, kwargs={"headers": NO_CACHE}))
+    assert current.followers_count == 20
+    assert len(users.requests) == 2
+
+
+def test_eviction_keeps_the_cache_within_its_size(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "responses.sqlite", max_size=250)
+    request = httpx.Request("GET", "https://api/tracks/1")
+    for key in "abc":
+        cache.set(key, httpx.Response(200, content=b"x" * 100, request=request), ttl=60)
+
+    assert cache.size == 200
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+    # The running total is restored when the cache is opened again
+    assert SQLiteResponseCache(tmp_path / "responses.sqlite", max_size=250).size == 200
@@ -0,0 +1,42 @@
+import asyncio
+
+from soundcloud_tools.checkpoint import Checkpoints, run_stage
+
+
+class Stage:
+    def __init__(self, result: list[int]):
+        self.result = result
+        self.runs = 0
+
+    async def __call__(self) -> list[int]:
+        self.runs += 1
+        return self.result
+
+
+def test_completed_stages_are_resumed(tmp_path):
+    path = tmp_path / "run"
+    stage = Stage([1, 2])
+    assert asyncio.run(Checkpoints("run", path=path).stage("collect", list[int], stage)) == [1, 2]
+
+    resumed = Checkpoints("run", resume=True, path=path)
+    assert asyncio.run(resumed.stage("collect", list[int], Stage([3]))) == [1, 2]
+    assert stage.runs == 1
+    assert not list(path.glob("*.tmp"))
+
+
+def test_runs_without_resume_start_from_scratch(tmp_path):
+    path = tmp_path / "run"
+    asyncio.run(Checkpoints("run", path=path).stage("collect", list[int], Stage([1, 2])))
+    assert asyncio.run(Checkpoints("run", path=path).stage("collect", list[int], Stage([3]))) == [3]
+
+    checkpoints = Checkpoints("run", resume=True, path=path)
+    checkpoints.clear()
+    assert not path.exists()
+    assert checkpoints.load("collect", list[int]) is None
+
+
+def test_stages_without_checkpoints_always_run():
+    stage = Stage([1])
+    asyncio.run(run_stage(None, "collect", list[int], stage))
+    asyncio.run(run_stage(None, "collect", list[int], stage))
+    assert stage.runs == 2
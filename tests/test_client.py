@@ -0,0 +1,49 @@
+import asyncio
+import gc
+import logging
+
+import httpx
+
+from soundcloud_tools.client import Client
+from tests.payloads import user
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json=user(1, likes_count=0))
+
+
+def test_run_closes_the_pool_of_each_loop(caplog):
+    client = Client(transport=httpx.MockTransport(handler))
+    pools = []
+
+    async def get_user():
+        pools.append(client.http)
+        return await client.get_user(user_id=1)
+
+    with caplog.at_level(logging.ERROR, logger="asyncio"):
+        first, second = client.run(get_user()), client.run(get_user())
+
+    assert first.id == second.id == 1
+    assert pools[0] is not pools[1]
+    assert all(pool.is_closed for pool in pools)
+    assert not caplog.records
+
+
+def test_pool_of_a_finished_loop_is_dropped(caplog):
+    client = Client(transport=httpx.MockTransport(handler))
+
+    with caplog.at_level(logging.ERROR, logger="asyncio"):
+        asyncio.run(client.get_user(user_id=1))
+        stale = client._http
+        asyncio.run(client.get_user(user_id=1))
+        gc.collect()
+
+    assert client._http is not stale
+    assert not caplog.records
+
+
+def test_explicit_transport_bypasses_the_proxy():
+    client = Client(transport=httpx.MockTransport(handler))
+    client.proxy = "http://127.0.0.1:9"
+
+    assert client.run(client.get_user(user_id=1)).id == 1
@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+
+from soundcloud_tools.client import Client
+from soundcloud_tools.models.identity import IdentityMap
+from soundcloud_tools.models.user import User
+from tests.payloads import user
+
+
+def test_identity_is_shared_across_responses():
+    followers = iter([10, 999])
+    reposts = [
+        {"created_at": "2024-01-01T00:00:00Z", "type": "track-repost", "uuid": str(i), "user": user(2, 0)}
+        for i in range(3)
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/stream":
+            return httpx.Response(200, json={"collection": reposts, "next_href": None})
+        return httpx.Response(200, json=user(1, likes_count=0) | {"followers_count": next(followers)})
+
+    async def run():
+        async with Client(transport=httpx.MockTransport(handler)) as client:
+            first = await client.get_user(user_id=1)
+            first_followers = first.followers_count
+            second = await client.get_user(user_id=1)
+            page = await client.get_stream(user_urn="soundcloud:users:1", projection="core")
+            return first_followers, first, second, page
+
+    first_followers, first, second, page = asyncio.run(run())
+    assert first_followers == 10
+    # The later response refreshes the shared instance
+    assert first is second
+    assert first.followers_count == 999
+    # Repeated entities within a page share one instance
+    assert len({id(item.user) for item in page.collection}) == 1
+
+
+def test_intern_keeps_the_first_copy_within_a_response():
+    identity_map = IdentityMap()
+    users = [User.model_validate(user(1, likes_count=n)) for n in (1, 2)]
+
+    interned = identity_map.intern(users)
+    assert interned[0] is interned[1] is users[0]
+    assert interned[0].likes_count == 1
+    assert identity_map.hits == 1
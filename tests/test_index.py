@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from soundcloud_tools.index import IDIndex, LikedTrackIndex, SeenTrackIndex
+from tests.fakes import FakeCollection, FakePlaylists
+from tests.payloads import NOW, playlist, user
+
+
+class FakeLikes(FakeCollection):
+    """Likes endpoint of user 1 over `track_ids` (newest first)."""
+
+    def __init__(self, track_ids: list[int]):
+        super().__init__([self.like(track_id, hours_ago=i) for i, track_id in enumerate(track_ids)])
+
+    @staticmethod
+    def like(track_id: int, hours_ago: float) -> dict:
+        created_at = (NOW - timedelta(hours=hours_ago)).isoformat()
+        return {"created_at": created_at, "kind": "like", "track": {"id": track_id, "kind": "track"}}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/users/1":
+            return httpx.Response(200, json=user(1, likes_count=len(self.items)))
+        return self.page(request)
+
+    def add(self, track_id: int):
+        self.items.insert(0, self.like(track_id, hours_ago=-len(self.items)))
+
+    def remove(self, track_id: int):
+        self.items = [like for like in self.items if like["track"]["id"] != track_id]
+
+
+@pytest.fixture
+def sync(run_client):
+    def sync(likes: FakeLikes, index: LikedTrackIndex) -> set[int]:
+        likes.offsets.clear()
+        return set(run_client(likes.handler, index.sync))
+
+    return sync
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return tmp_path / "likes-1"
+
+
+def test_id_index():
+    index = IDIndex([5, 3, 5, 1])
+    assert list(index) == [1, 3, 5]
+    assert 3 in index and 4 not in index and 6 not in index
+    assert index.add([4, 5, 9]) == 2
+    assert list(index) == [1, 3, 4, 5, 9]
+
+
+def test_id_index_round_trip(tmp_path):
+    path = tmp_path / "ids"
+    IDIndex([3, 1, 2]).save(path)
+    # Raw values appended in any order are sorted and deduplicated on load
+    with path.open("ab") as f:
+        f.write(IDIndex([7, 2]).ids.tobytes())
+    assert list(IDIndex.load(path)) == [1, 2, 3, 7]
+    assert len(IDIndex.load(tmp_path / "missing")) == 0
+
+
+def test_liked_index_first_sync(index_path, sync):
+    likes = FakeLikes(list(range(1, 451)))
+    assert sync(likes, LikedTrackIndex(1, path=index_path)) == set(range(1, 451))
+    assert len(likes.offsets) == 3
+
+
+def test_liked_index_fetches_only_new_likes(index_path, sync):
+    likes = FakeLikes(list(range(1, 451)))
+    sync(likes, LikedTrackIndex(1, path=index_path))
+    likes.add(1000)
+
+    assert sync(likes, LikedTrackIndex(1, path=index_path)) == {*range(1, 451), 1000}
+    assert len(likes.offsets) == 1
+
+
+def test_liked_index_resyncs_after_unlike(index_path, sync):
+    likes = FakeLikes(list(range(1, 451)))
+    sync(likes, LikedTrackIndex(1, path=index_path))
+    likes.remove(200)
+    likes.add(1000)
+
+    index = LikedTrackIndex(1, path=index_path)
+    assert sync(likes, index) == ({*range(1, 451), 1000} - {200})
+    assert len(likes.offsets) == 4
+    assert index.state.remote_count == 450
+
+
+@pytest.fixture
+def backfill(run_client):
+    def backfill(playlists: FakePlaylists, index: SeenTrackIndex, force: bool = False) -> set[int]:
+        async def run(client):
+            if force:
+                await index.backfill(client)
+            return await index.sync(client)
+
+        playlists.fetched.clear()
+        return set(run_client(playlists.handler, run))
+
+    return backfill
+
+
+def test_seen_index_appends_posted_tracks(tmp_path):
+    index = SeenTrackIndex(1, path=tmp_path / "seen-1")
+    index.add([3, 1, 2], playlist_id=10)
+    index.add([2, 4])
+
+    reloaded = SeenTrackIndex(1, path=tmp_path / "seen-1")
+    assert list(reloaded.ids) == [1, 2, 3, 4]
+    assert reloaded.state.playlist_ids == {10}
+    # Only new IDs are appended to the log
+    assert (tmp_path / "seen-1.ids").stat().st_size == 4 * 8
+
+
+def test_seen_index_backfills_weekly_playlists(tmp_path, backfill):
+    playlists = FakePlaylists(
+        [
+            playlist(10, "Weekly Favorites 2024-01-07", [1, 2]),
+            playlist(11, "Weekly Favorites 2024-01-14", [2, 3]),
+            playlist(12, "Road Trip", [4]),
+        ]
+    )
+    path = tmp_path / "seen-1"
+    assert backfill(playlists, SeenTrackIndex(1, path=path)) == {1, 2, 3}
+    assert sorted(playlists.fetched) == [10, 11]
+
+    # Once backfilled, syncs only fetch weekly playlists that are missing from the index
+    assert backfill(playlists, SeenTrackIndex(1, path=path)) == {1, 2, 3}
+    assert playlists.fetched == []
+
+    # An explicit backfill only fetches the weekly playlists that are not indexed yet
+    playlists.playlists[13] = playlist(13, "Weekly Favorites 2024-01-21", [3, 5])
+    assert backfill(playlists, SeenTrackIndex(1, path=path), force=True) == {1, 2, 3, 5}
+    assert playlists.fetched == [13]
+
+
+def test_seen_index_sync_reconciles_lost_playlists(tmp_path, backfill):
+    playlists = FakePlaylists([playlist(10, "Weekly Favorites 2024-01-07", [1, 2])])
+    path = tmp_path / "seen-1"
+    backfill(playlists, SeenTrackIndex(1, path=path))
+
+    # Posted by a run whose local index was lost
+    playlists.playlists[11] = playlist(11, "Weekly Favorites 2024-01-14", [3])
+    index = SeenTrackIndex(1, path=path)
+    assert backfill(playlists, index) == {1, 2, 3}
+    assert playlists.fetched == [11]
+    assert index.state.playlist_ids == {10, 11}
@@ -0,0 +1,19 @@
+import argparse
+
+import pytest
+
+from soundcloud_tools.__main__ import parse_weeks
+
+
+def test_parse_weeks():
+    assert parse_weeks("8..0") == range(-8, 1)
+    # The order of the bounds does not matter
+    assert parse_weeks("0..8") == range(-8, 1)
+    assert parse_weeks("3") == range(-3, -2)
+    assert parse_weeks("4..2") == range(-4, -1)
+
+
+@pytest.mark.parametrize("value", ["", "a..b", "8..", "-1..0", "0..-2"])
+def test_parse_invalid_weeks(value: str):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_weeks(value)
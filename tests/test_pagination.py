@@ -0,0 +1,80 @@
+import asyncio
+from contextlib import aclosing
+from types import SimpleNamespace
+
+from soundcloud_tools.pagination import Paginator
+
+
+class FakeEndpoint:
+    """Route method over `count` items, logging when each page is requested and returned."""
+
+    def __init__(self, count: int, limit: int = 10):
+        self.items = list(range(count))
+        self.limit = limit
+        self.events: list[str] = []
+
+    async def __call__(self, offset: int | str | None = None, **kwargs) -> SimpleNamespace:
+        offset = int(offset or 0)
+        self.events.append(f"request {offset}")
+        await asyncio.sleep(0)
+        self.events.append(f"return {offset}")
+        more = offset + self.limit < len(self.items)
+        next_href = f"https://api/items?offset={offset + self.limit}" if more else None
+        return SimpleNamespace(collection=self.items[offset : offset + self.limit], next_href=next_href)
+
+
+def iterate(paginator: Paginator, endpoint: FakeEndpoint, pages: int | None = None) -> list[int]:
+    async def run():
+        items = []
+        async with aclosing(paginator.__aiter__()) as responses:
+            async for response in responses:
+                await asyncio.sleep(0)
+                endpoint.events.append(f"process {response.collection[0]}")
+                items += response.collection
+                if pages is not None and paginator.pages == pages:
+                    break
+        # A cancelled read-ahead would return here
+        await asyncio.sleep(0)
+        return items
+
+    return asyncio.run(run())
+
+
+def test_next_page_is_requested_while_processing():
+    endpoint = FakeEndpoint(25)
+    assert iterate(Paginator(endpoint), endpoint) == list(range(25))
+    assert endpoint.events == [
+        *["request 0", "return 0"],
+        *["request 10", "process 0", "return 10"],
+        *["request 20", "process 10", "return 20"],
+        "process 20",
+    ]
+
+
+def test_pages_are_requested_in_turn_without_prefetch():
+    endpoint = FakeEndpoint(25)
+    iterate(Paginator(endpoint, prefetch=False), endpoint)
+    assert endpoint.events == [
+        *["request 0", "return 0", "process 0"],
+        *["request 10", "return 10", "process 10"],
+        *["request 20", "return 20", "process 20"],
+    ]
+
+
+def test_until_stops_after_the_matching_page():
+    endpoint = FakeEndpoint(100)
+    paginator = Paginator(endpoint, until=lambda response: 15 in response.collection)
+    assert iterate(paginator, endpoint) == list(range(20))
+    assert paginator.pages == 2
+
+
+def test_numeric_steps():
+    endpoint = FakeEndpoint(25)
+    assert iterate(Paginator(endpoint, step=10), endpoint) == list(range(25))
+    assert asyncio.run(Paginator(endpoint, step=10).collect()) == list(range(25))
+
+
+def test_closing_cancels_the_prefetched_page():
+    endpoint = FakeEndpoint(100)
+    assert iterate(Paginator(endpoint), endpoint, pages=1) == list(range(10))
+    assert endpoint.events == ["request 0", "return 0", "request 10", "process 0"]
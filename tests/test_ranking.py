@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+import numpy as np
+
+from soundcloud_tools.models.track import Track
+from soundcloud_tools.ranking import Weights, normalize, rank_tracks
+from tests.payloads import NOW, full_track, user
+
+
+def track(track_id: int, plays: int = 10, followers: int = 0, days_ago: int = 0, duration: int = 300_000) -> Track:
+    return Track.model_validate(
+        full_track(track_id, created_at=NOW - timedelta(days=days_ago))
+        | {"playback_count": plays, "duration": duration, "user": user(1, 0) | {"followers_count": followers}}
+    )
+
+
+def ranked_ids(tracks: list[Track], weights: Weights | str, **kwargs) -> list[int]:
+    return [t.id for t in rank_tracks(tracks, weights, **kwargs)]
+
+
+def test_normalize():
+    assert normalize(np.array([2.0, 4.0, 3.0])).tolist() == [0.0, 1.0, 0.5]
+    assert normalize(np.array([5.0, 5.0])).tolist() == [0.0, 0.0]
+    assert normalize(np.array([])).tolist() == []
+
+
+def test_presets():
+    tracks = [track(1, plays=5, followers=300), track(2, plays=50, followers=10), track(3, plays=20, followers=1000)]
+    assert ranked_ids(tracks, "playcount") == [2, 3, 1]
+    assert ranked_ids(tracks, "followers") == [3, 1, 2]
+    assert ranked_ids(tracks, "frequency", frequency={1: 3, 3: 2}) == [1, 3, 2]
+
+
+def test_custom_weights():
+    tracks = [track(1, days_ago=20, duration=200_000), track(2, days_ago=1, duration=400_000), track(3, days_ago=5)]
+    assert ranked_ids(tracks, Weights(recency=1)) == [2, 3, 1]
+    # Negative weights prefer low values
+    assert ranked_ids(tracks, Weights(duration=-1)) == [1, 3, 2]
+
+
+def test_ties_keep_their_order_and_duplicates_are_dropped():
+    tracks = [track(1), track(2), track(1), track(3)]
+    assert ranked_ids(tracks, "playcount") == [1, 2, 3]
+    assert ranked_ids([], "balanced") == []
@@ -0,0 +1,90 @@
+from datetime import timedelta
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from soundcloud_tools.rate_limit import RateLimiter, RetryPolicy, get_retry_after
+from tests.payloads import NOW
+
+URL = "https://api/users/1"
+
+
+class FlakyEndpoint:
+    """Answers with the `failures` first, then with 200."""
+
+    def __init__(self, *failures: int | Exception, retry_after: str | None = None):
+        self.failures = list(failures)
+        self.retry_after = retry_after
+        self.requests = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if not self.failures:
+            return httpx.Response(200)
+        failure = self.failures.pop(0)
+        if isinstance(failure, Exception):
+            raise failure
+        return httpx.Response(failure, headers={"Retry-After": self.retry_after} if self.retry_after else {})
+
+
+@pytest.fixture
+def send(run_client):
+    def send(endpoint: FlakyEndpoint, method: str = "GET", **kwargs) -> tuple[int, RateLimiter]:
+        rate_limiter = RateLimiter(rate=1000)
+        response = run_client(
+            endpoint.handler,
+            lambda client: client.send_request(method, URL),
+            rate_limiter=rate_limiter,
+            retry_policy=RetryPolicy(base_delay=0, **kwargs),
+        )
+        return response.status_code, rate_limiter
+
+    return send
+
+
+def test_retry_after():
+    assert get_retry_after(httpx.Response(429, headers={"Retry-After": "2.5"})) == 2.5
+    assert get_retry_after(httpx.Response(429, headers={"Retry-After": "-1"})) == 0
+    retry_at = format_datetime(NOW + timedelta(seconds=30), usegmt=True)
+    assert 0 < get_retry_after(httpx.Response(429, headers={"Retry-After": retry_at})) <= 30
+    assert get_retry_after(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+    assert get_retry_after(httpx.Response(429)) is None
+
+
+def test_rate_adapts_to_rate_limiting():
+    limiter = RateLimiter(rate=4, min_rate=1, increase=1)
+    limiter.on_rate_limited()
+    assert limiter.rate == 2
+    limiter.on_rate_limited()
+    limiter.on_rate_limited()
+    assert limiter.rate == 1
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == limiter.max_rate == 16
+
+
+def test_transient_failures_are_retried(send):
+    endpoint = FlakyEndpoint(503, httpx.ConnectError("refused"), 502)
+    assert send(endpoint)[0] == 200
+    assert endpoint.requests == 4
+
+
+def test_rate_limited_requests_slow_down_and_retry(send):
+    endpoint = FlakyEndpoint(429, retry_after="0")
+    status_code, rate_limiter = send(endpoint, method="POST")
+    assert status_code == 200
+    assert rate_limiter.rate < 1000
+
+
+def test_failed_posts_are_not_retried(send):
+    # The server may have applied a POST that failed with a server error
+    endpoint = FlakyEndpoint(503)
+    assert send(endpoint, method="POST")[0] == 503
+    assert endpoint.requests == 1
+
+
+def test_retries_are_limited(send):
+    endpoint = FlakyEndpoint(503, 503, 503)
+    assert send(endpoint, max_retries=2)[0] == 503
+    assert endpoint.requests == 3
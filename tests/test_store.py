@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from soundcloud_tools.models.core import RepostsCore
+from soundcloud_tools.models.following import Followings
+from soundcloud_tools.store import EntityStore
+from tests.payloads import NOW, track
+
+
+def reposts(user_id: int, track_ids: list[int], days_ago: int) -> RepostsCore:
+    created_at = (NOW - timedelta(days=days_ago)).isoformat()
+    return RepostsCore.model_validate(
+        {
+            "collection": [
+                {
+                    "created_at": created_at,
+                    "type": "track-repost",
+                    "user": {"id": user_id, "username": f"user-{user_id}"},
+                    "track": track(track_id),
+                }
+                for track_id in track_ids
+            ]
+        }
+    )
+
+
+def test_following_reposts(tmp_path):
+    store = EntityStore(tmp_path / "entities.sqlite")
+    store.add_response(Followings(collection=[2, 3], next_href=None, query_urn=None), user_id=1)
+    store.add_response(reposts(2, [10, 11], days_ago=1))
+    store.add_response(reposts(3, [12], days_ago=10))
+    store.add_response(reposts(4, [13], days_ago=1))
+
+    edges = store.get_following_reposts(1, start=NOW - timedelta(days=7), end=NOW)
+    assert sorted((edge.user_id, edge.target_id) for edge in edges) == [(2, 10), (2, 11)]
+    assert sorted(store.get_following_ids(1)) == [2, 3]
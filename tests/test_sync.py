@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from soundcloud_tools.sync import StreamSync
+from soundcloud_tools.utils import frozen_time
+from tests.fakes import FakeCollection
+from tests.payloads import NOW
+
+
+def stream_item(uuid: str, hours_ago: float) -> dict:
+    return {
+        "created_at": (NOW - timedelta(hours=hours_ago)).isoformat(),
+        "type": "track-repost",
+        "uuid": uuid,
+        "user": {"id": 2, "username": "reposter"},
+        "track": {"id": int(uuid.removeprefix("item-")), "title": uuid},
+    }
+
+
+class FakeStream(FakeCollection):
+    """Stream endpoint over `count` items, the newest is `item-0`."""
+
+    def __init__(self, count: int, hours_apart: float = 1):
+        super().__init__([stream_item(f"item-{i}", i * hours_apart) for i in range(count)])
+
+    def add(self, *uuids: str):
+        self.items[:0] = [stream_item(uuid, 0) for uuid in uuids]
+
+
+@pytest.fixture
+def sync(run_client):
+    def sync(stream: FakeStream, stream_sync: StreamSync, start: datetime) -> list[str]:
+        with frozen_time(NOW):
+            items = run_client(stream.page, lambda client: stream_sync.sync(client, start=start))
+        return [item.uuid for item in items]
+
+    return sync
+
+
+@pytest.fixture
+def stream_sync(tmp_path) -> StreamSync:
+    return StreamSync(user_id=1, path=tmp_path / "stream.json")
+
+
+def test_first_sync_fetches_window(stream_sync, sync):
+    stream = FakeStream(500)
+    uuids = sync(stream, stream_sync, start=NOW - timedelta(hours=250.5))
+    assert uuids == [f"item-{i}" for i in range(251)]
+    assert stream.offsets == [0, 200, 400]
+
+
+def test_sync_stops_at_watermark(stream_sync, sync):
+    stream = FakeStream(500)
+    start = NOW - timedelta(hours=250.5)
+    sync(stream, stream_sync, start=start)
+    stream.add("item-1000", "item-1001")
+    stream.offsets.clear()
+
+    uuids = sync(stream, StreamSync(user_id=1, path=stream_sync.path), start=start)
+    assert uuids[:2] == ["item-1000", "item-1001"]
+    assert len(uuids) == 253
+    assert stream.offsets == [0]
+
+
+def test_sync_extends_coverage_without_gap_after_removals(stream_sync, sync):
+    stream = FakeStream(500)
+    sync(stream, stream_sync, start=NOW - timedelta(hours=100.5))
+    # Removing stored items shifts the offsets of all older items
+    del stream.items[10:20]
+    stream.add("item-1000")
+
+    uuids = sync(stream, stream_sync, start=NOW - timedelta(hours=300.5))
+    expected = ["item-1000"] + [item["uuid"] for item in stream.items[1:] if int(item["uuid"][5:]) <= 300]
+    assert uuids == expected
+    assert stream_sync.state.covered_since == NOW - timedelta(hours=300.5)
+
+
+def test_sync_replaces_outdated_items(stream_sync, sync):
+    stream = FakeStream(50)
+    start = NOW - timedelta(hours=10.5)
+    sync(stream, stream_sync, start=start)
+    # More new items than the window holds, the stored ones are not reached
+    stream.items = [stream_item(f"item-{1000 + i}", i) for i in range(50)]
+
+    uuids = sync(stream, stream_sync, start=start)
+    assert uuids == [f"item-{1000 + i}" for i in range(11)]
+
+
+def test_sync_drops_items_after_retention(tmp_path, sync):
+    stream = FakeStream(100, hours_apart=24)
+    stream_sync = StreamSync(user_id=1, path=tmp_path / "stream.json", retention=timedelta(days=7))
+    sync(stream, stream_sync, start=NOW - timedelta(days=30))
+    assert len(stream_sync.state.items) == 8
+    assert stream_sync.state.covered_since == NOW - timedelta(days=7)
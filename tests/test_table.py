@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from soundcloud_tools.models.core import LikeCore, TrackCore
+from soundcloud_tools.models.table import TrackTable
+from tests.payloads import NOW, track
+
+
+def like(track_id: int, days_ago: int, **fields) -> LikeCore:
+    created_at = NOW - timedelta(days=days_ago)
+    return LikeCore(created_at=created_at, track=TrackCore.model_validate(track(track_id) | fields))
+
+
+def ids(table: TrackTable) -> list[int]:
+    return table["id"].tolist()
+
+
+def test_columns_from_items():
+    bare = TrackCore.model_validate(track(3, title="Bare"))
+    table = TrackTable.from_items([like(1, days_ago=2, playback_count=None), LikeCore(created_at=NOW), bare])
+    # Items without a track are skipped
+    assert ids(table) == [1, 3]
+    assert table["type"].tolist() == ["like", "track"]
+    assert table["title"].tolist() == ["track-1", "Bare"]
+    assert table["artist"].tolist() == ["artist", "artist"]
+    assert table["playback_count"].tolist() == [0, 10]
+    assert table["followers_count"].tolist() == [5, 5]
+    # Likes are added when liked, bare tracks when uploaded
+    assert table["added_at"][0] == np.datetime64((NOW - timedelta(days=2)).replace(tzinfo=None), "us")
+    assert table["added_at"][1] == table["created_at"][1]
+    assert table.track_at(1) is bare
+
+
+def test_sort_keeps_ties_in_order():
+    table = TrackTable.from_items([like(1, 0, likes_count=5), like(2, 0, likes_count=9), like(3, 0, likes_count=5)])
+    assert ids(table.sort("likes_count")) == [1, 3, 2]
+    assert ids(table.sort("likes_count", descending=True)) == [2, 1, 3]
+
+
+def test_dedup_keeps_the_first_row():
+    table = TrackTable.from_items([like(2, 0), like(1, 1), like(2, 2), like(3, 3)])
+    deduped = table.dedup("id")
+    assert ids(deduped) == [2, 1, 3]
+    assert deduped["added_at"][0] == table["added_at"][0]
+
+
+def test_filters():
+    table = TrackTable.from_items(
+        [like(1, days_ago=1, title="Deep House"), like(2, days_ago=5, title="Techno"), like(3, days_ago=9)]
+    )
+    assert ids(table.filter(table.isin("id", [3, 1, 7]))) == [1, 3]
+    today = NOW.date()
+    assert ids(table.filter(table.between("added_at", today - timedelta(days=5), today))) == [1, 2]
+    assert ids(table.filter(table.between("added_at", date.min, today - timedelta(days=6)))) == [3]
+    assert ids(table.filter(table.matches("house|TECHNO"))) == [1, 2]
+    assert ids(table.filter(table.matches("^artist$", columns=["artist"]))) == [1, 2, 3]
+
+
+def test_concat():
+    first, second = TrackTable.from_items([like(1, 0)]), TrackTable.from_items([like(2, 0), like(3, 0)])
+    assert ids(TrackTable.concat([first, second])) == [1, 2, 3]
+    assert len(TrackTable.concat([])) == 0
+    assert TrackTable.concat([]).columns.keys() == first.columns.keys()
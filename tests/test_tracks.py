@@ -0,0 +1,41 @@
+import asyncio
+
+import httpx
+
+from tests.payloads import full_track
+
+
+class FakeTracks:
+    """Tracks endpoint that returns the requested tracks in reverse order, skipping `missing` ones."""
+
+    def __init__(self, missing: frozenset[int] = frozenset()):
+        self.missing = missing
+        self.chunks: list[list[int]] = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        ids = [int(id) for id in request.url.params["ids"].split(",")]
+        self.chunks.append(ids)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return httpx.Response(200, json=[full_track(id) for id in reversed(ids) if id not in self.missing])
+
+
+def test_tracks_are_fetched_in_concurrent_chunks(run_client):
+    tracks = FakeTracks()
+    track_ids = list(range(1, 21))
+    fetched = run_client(tracks.handler, lambda client: client.get_all_tracks(track_ids, chunk_size=5, concurrency=2))
+    assert [track.id for track in fetched] == track_ids
+    assert sorted(tracks.chunks) == [track_ids[i : i + 5] for i in range(0, 20, 5)]
+    assert tracks.max_in_flight == 2
+
+
+def test_missing_tracks_and_duplicates(run_client):
+    tracks = FakeTracks(missing=frozenset({3}))
+    lookup = run_client(tracks.handler, lambda client: client.fetch_tracks([5, 3, 1, 5, 2], chunk_size=2))
+    assert [track.id for track in lookup.tracks] == [5, 1, 2]
+    assert lookup.missing == [3]
+    # Duplicates are only requested once
+    assert sorted(id for chunk in tracks.chunks for id in chunk) == [1, 2, 3, 5]
@@ -0,0 +1,78 @@
+import pytest
+
+from soundcloud_tools.checkpoint import Checkpoints
+from soundcloud_tools.index import SeenTrackIndex
+from soundcloud_tools.models.track import Track
+from soundcloud_tools.snapshot import SnapshotTrack, Surfacing, WeeklySnapshot
+from soundcloud_tools.weekly import create_weekly_favorite_playlist, create_weekly_favorite_playlists, get_week_timespan
+from tests import payloads
+from tests.fakes import FakePlaylists
+
+
+@pytest.fixture
+def create_playlists(run_client):
+    def create_playlists(playlists: FakePlaylists, weeks: range, resume: bool = False) -> dict[int, list[int]]:
+        return run_client(
+            playlists.handler,
+            lambda client: create_weekly_favorite_playlists(
+                client, user_id=1, types=["track"], weeks=weeks, resume=resume
+            ),
+        )
+
+    return create_playlists
+
+
+def save_snapshot(weeks: range) -> WeeklySnapshot:
+    """Snapshot with one track surfaced in the middle of each week, tracks are numbered by week."""
+    tracks = []
+    for week in weeks:
+        start, end = get_week_timespan(week)
+        track = Track.model_validate(payloads.full_track(100 + week, created_at=start))
+        tracks.append(SnapshotTrack(track=track, surfaced=[Surfacing(type="track", at=start + (end - start) / 2)]))
+    start, _ = get_week_timespan(min(weeks))
+    _, end = get_week_timespan(max(weeks))
+    snapshot = WeeklySnapshot(user_id=1, start=start, end=end, types=["track"], tracks=tracks, seen_track_ids=set())
+    snapshot.save()
+    return snapshot
+
+
+def test_resumed_weeks_are_not_posted_again(data_path, create_playlists):
+    weeks = range(-2, 1)
+    save_snapshot(weeks)
+    with pytest.raises(RuntimeError):
+        create_playlists(FakePlaylists(fail_after=1), weeks, resume=True)
+
+    playlists = FakePlaylists()
+    assert create_playlists(playlists, weeks, resume=True) == {-2: [98], -1: [99], 0: [100]}
+    assert playlists.posted == [[99], [100]]
+    assert not list((data_path / "state").iterdir())
+
+
+def test_resumed_run_continues_after_the_last_stage(data_path, run_client):
+    snapshot = save_snapshot(range(0, 1))
+    seen_index = SeenTrackIndex(1, path=data_path / "seen-1")
+
+    def create(playlists: FakePlaylists, **kwargs) -> list[int]:
+        checkpoints = Checkpoints("weekly", resume=True, path=data_path / "state")
+        return run_client(
+            playlists.handler,
+            lambda client: create_weekly_favorite_playlist(
+                client, user_id=1, types=["track"], checkpoints=checkpoints, seen_index=seen_index, **kwargs
+            ),
+        )
+
+    with pytest.raises(RuntimeError):
+        create(FakePlaylists(fail_after=0), snapshot=snapshot)
+    assert {path.name for path in (data_path / "state").iterdir()} == {"collect.json", "enrich.json"}
+
+    # Without a snapshot, collecting again would request the stream
+    playlists = FakePlaylists()
+    assert create(playlists) == [100]
+    assert playlists.posted == [[100]]
+
+    # A playlist that was posted is only marked as seen again
+    playlists = FakePlaylists()
+    assert create(playlists) == [100]
+    assert playlists.posted == []
+    assert list(seen_index.ids) == [100]
+    assert seen_index.state.playlist_ids == {1001}